@@ -3,20 +3,68 @@ tokn Backend API Server
 Flask application providing DSPy and GEPA optimization endpoints
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import sys
 import os
+import shutil
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Add current directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson
+
+    Used by jsonify() and request.get_json(). Types orjson can't serialize
+    fall back to Flask's default provider.
+    """
+
+    def dumps(self, obj, **kwargs):
+        try:
+            return orjson.dumps(obj).decode('utf-8')
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        try:
+            body = orjson.dumps(obj)
+        except TypeError:
+            body = super().dumps(obj)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
 app = Flask(__name__)
 
+# Use orjson for request parsing and responses when available
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+
 # Configure CORS - Reads from environment variable for production
-cors_origins = os.environ.get('CORS_ORIGINS', 'http://localhost:3000,http://localhost:5173,*')
-origins_list = [origin.strip() for origin in cors_origins.split(',')]
-CORS(app, origins=origins_list)
+# A concrete allow-list plus max_age lets browsers cache preflight responses
+# for a day instead of sending OPTIONS before each API call
+cors_origins = os.environ.get('CORS_ORIGINS', 'http://localhost:3000,http://localhost:5173')
+origins_list = [origin.strip() for origin in cors_origins.split(',') if origin.strip()]
+if os.environ.get('DEBUG', 'False').lower() == 'true' and '*' not in origins_list:
+    origins_list.append('*')
+CORS(
+    app,
+    origins=origins_list,
+    max_age=86400,
+    methods=['GET', 'POST', 'OPTIONS'],
+    allow_headers=['Content-Type', 'Authorization']
+)
 
 # Import route handlers
 from routes.health_route import health_bp
@@ -28,21 +76,35 @@ app.register_blueprint(health_bp, url_prefix='/api')
 app.register_blueprint(dspy_bp, url_prefix='/api')
 app.register_blueprint(gepa_bp, url_prefix='/api')
 
+# Warm optimizer workers (no-op unless WORKER_POOL_SIZE > 0) are started by the
+# process that serves requests: below for the Flask server, in the
+# post_worker_init hook (gunicorn.conf.py) for each gunicorn worker. Starting
+# them at import would spawn a pool in the launcher that gunicorn then discards.
+import worker_pool
+
+# Error bodies never change, so serialize them once. Each error still gets
+# its own Response because after_request hooks (CORS) modify the headers.
+from wire import dumps
+
+_NOT_FOUND_BODY = dumps({
+    'success': False,
+    'error': 'Endpoint not found',
+    'code': 'NOT_FOUND'
+})
+
+_INTERNAL_ERROR_BODY = dumps({
+    'success': False,
+    'error': 'Internal server error',
+    'code': 'INTERNAL_ERROR'
+})
+
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({
-        'success': False,
-        'error': 'Endpoint not found',
-        'code': 'NOT_FOUND'
-    }), 404
+    return Response(_NOT_FOUND_BODY, status=404, mimetype='application/json')
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({
-        'success': False,
-        'error': 'Internal server error',
-        'code': 'INTERNAL_ERROR'
-    }), 500
+    return Response(_INTERNAL_ERROR_BODY, status=500, mimetype='application/json')
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
@@ -51,6 +113,35 @@ if __name__ == '__main__':
     print(f"Starting tokn Backend API on port {port}")
     print(f"Debug mode: {debug}")
 
+    # In production, hand the process over to gunicorn with gevent workers so
+    # long-running, I/O-bound optimization requests don't block each other
+    if os.environ.get('ENV', '').lower() == 'production' and not debug:
+        gunicorn = shutil.which('gunicorn')
+        if gunicorn:
+            # One gevent worker already serves requests concurrently; each extra
+            # worker loads its own copy of DSPy/MLflow
+            workers = os.environ.get('GUNICORN_WORKERS', '1')
+            timeout = os.environ.get('GUNICORN_TIMEOUT', '600')
+            print(f"Serving with gunicorn (gevent, {workers} workers)")
+            # execv replaces the process without flushing Python's stdout buffer
+            sys.stdout.flush()
+            os.chdir(os.path.dirname(os.path.abspath(__file__)))
+            os.execv(gunicorn, [
+                gunicorn,
+                '-c', 'gunicorn.conf.py',
+                '-k', 'gevent',
+                '-w', workers,
+                '--worker-connections', '1000',
+                '--timeout', timeout,
+                '-b', f'0.0.0.0:{port}',
+                'app:app'
+            ])
+        print("gunicorn not installed, falling back to the Flask server")
+
+    # With the debug reloader, only the child process serves requests
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        worker_pool.start()
+
     app.run(
         host='0.0.0.0',
         port=port,
@@ -3,9 +3,10 @@
 DSPy Optimization Worker
 Runs actual DSPy optimization and returns results to Node.js
 
-Communication Protocol:
+Communication Protocol (see wire.py):
 - Input: JSON configuration via stdin
 - Output: JSON messages via stdout (line-delimited)
+- Set WORKER_WIRE_FORMAT=msgpack for length-prefixed msgpack in both directions
 
 Message Types:
 - {'type': 'progress', 'message': '...', 'data': {...}}
@@ -14,17 +15,46 @@ Message Types:
 """
 
 import sys
-import json
 import os
 from typing import List, Dict, Any, Callable, Optional
 import traceback
 
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from wire import send, send_progress, recv
+
+DEBUG = os.environ.get('DEBUG', 'False').lower() == 'true'
+
+# Demos returned for display: per predictor and across the whole program
+MAX_DEMOS_PER_PREDICTOR = 10
+MAX_DEMOS = 30
+
+try:
+    import dspy
+    from dspy.teleprompt import MIPROv2
+    from dspy.evaluate import Evaluate
+    _DSPY_IMPORT_ERROR = None
+except ImportError as e:
+    dspy = None
+    MIPROv2 = None
+    Evaluate = None
+    _DSPY_IMPORT_ERROR = e
+
+try:
+    from dspy.evaluate import SemanticF1
+except ImportError:
+    SemanticF1 = None
+
+try:
+    from dspy.adapters import ChatAdapter
+except ImportError:
+    ChatAdapter = None
+
+
 def log_progress(message: str, data: Optional[Dict] = None):
     """Send progress message to Node.js"""
-    progress = {'type': 'progress', 'message': message}
-    if data:
-        progress['data'] = data
-    print(json.dumps(progress), flush=True)
+    send_progress(message, data)
 
 
 def log_error(message: str, tb: Optional[str] = None):
@@ -32,7 +62,7 @@ def log_error(message: str, tb: Optional[str] = None):
     error = {'type': 'error', 'message': message}
     if tb:
         error['traceback'] = tb
-    print(json.dumps(error), flush=True)
+    send(error, flush_now=True)
 
 
 # ============================================================================
@@ -54,8 +84,6 @@ def setup_language_model(config: Dict[str, Any]):
     Returns:
         Configured DSPy LM instance
     """
-    import dspy
-
     provider = config.get('provider', 'openai')
     model_id = config.get('model', 'gpt-4o-mini')
     api_key = config.get('api_key', '')
@@ -110,29 +138,41 @@ def prepare_dataset(dataset_raw: List[Dict[str, Any]], dataset_name: str = "data
     Returns:
         List of dspy.Example objects
     """
-    import dspy
-
     if not dataset_raw or len(dataset_raw) == 0:
         raise ValueError(f"{dataset_name} is empty")
 
-    examples = []
-
-    for i, item in enumerate(dataset_raw):
-        if 'input' not in item or 'output' not in item:
-            raise ValueError(f"{dataset_name}[{i}] missing 'input' or 'output' field")
-
-        # Create DSPy Example with question -> answer signature
+    try:
+        # Create DSPy Examples with question -> answer signature in one pass
         # .with_inputs() marks which fields are inputs (vs outputs)
-        example = dspy.Example(
-            question=str(item['input']),
-            answer=str(item['output'])
-        ).with_inputs('question')
-
-        examples.append(example)
+        examples = [
+            dspy.Example(
+                question=str(item['input']),
+                answer=str(item['output'])
+            ).with_inputs('question')
+            for item in dataset_raw
+        ]
+    except (KeyError, TypeError):
+        # Only walk the rows again to locate the bad one for the error message
+        for i, item in enumerate(dataset_raw):
+            if not isinstance(item, dict) or 'input' not in item or 'output' not in item:
+                raise ValueError(f"{dataset_name}[{i}] missing 'input' or 'output' field")
+        raise
+
+    # Normalize expected answers once for the string metrics
+    # (underscore attributes are not stored as Example fields)
+    for example in examples:
+        example._normalized_answer = normalize_answer(example.answer)
 
     return examples
 
 
+def normalize_answer(answer: Any) -> str:
+    """Normalize an answer for case-insensitive comparison"""
+    if not isinstance(answer, str):
+        answer = str(answer)
+    return answer.strip().casefold()
+
+
 # ============================================================================
 # METRIC CREATION
 # ============================================================================
@@ -149,21 +189,22 @@ def create_metric(metric_config: Dict[str, Any]) -> Callable:
     Returns:
         Metric function: (example, prediction, trace) -> float/bool
     """
-    import dspy
-
     metric_type = metric_config.get('type', 'exact_match')
 
     if metric_type == 'exact_match':
         # Simple exact string match metric (case-insensitive)
         def exact_match_metric(example, pred, trace=None):
             """Exact match between expected and predicted answer"""
-            if not hasattr(pred, 'answer'):
+            predicted = getattr(pred, 'answer', None)
+            if predicted is None:
                 return False
 
-            expected = str(example.answer).strip().lower()
-            predicted = str(pred.answer).strip().lower()
+            # Examples copied by DSPy lose the precomputed value
+            expected = getattr(example, '_normalized_answer', None)
+            if expected is None:
+                expected = normalize_answer(example.answer)
 
-            return expected == predicted
+            return expected == normalize_answer(predicted)
 
         return exact_match_metric
 
@@ -171,30 +212,48 @@ def create_metric(metric_config: Dict[str, Any]) -> Callable:
         # Check if expected answer is contained in prediction (case-insensitive)
         def contains_metric(example, pred, trace=None):
             """Check if expected answer is contained in prediction"""
-            if not hasattr(pred, 'answer'):
+            predicted = getattr(pred, 'answer', None)
+            if predicted is None:
                 return False
 
-            expected = str(example.answer).strip().lower()
-            predicted = str(pred.answer).strip().lower()
+            # Examples copied by DSPy lose the precomputed value
+            expected = getattr(example, '_normalized_answer', None)
+            if expected is None:
+                expected = normalize_answer(example.answer)
 
-            return expected in predicted
+            return expected in normalize_answer(predicted)
 
         return contains_metric
 
     elif metric_type == 'semantic_f1':
         # Use DSPy's built-in SemanticF1 metric
         # This compares semantic similarity using embeddings
-        try:
-            from dspy.evaluate import SemanticF1
-            return SemanticF1()
-        except ImportError:
+        if SemanticF1 is None:
             log_progress("SemanticF1 not available, falling back to exact match")
             return create_metric({'type': 'exact_match'})
+        return SemanticF1()
 
     else:
         raise ValueError(f"Unknown metric type: {metric_type}. Use 'exact_match', 'contains', or 'semantic_f1'.")
 
 
+def resolve_num_threads(metric_config: Dict[str, Any]) -> int:
+    """
+    Number of threads for evaluation and optimization
+
+    Each example is an I/O-bound LM call, so threads scale until the provider's
+    rate limit. Read from metric_config['num_threads'], then DSPY_EVAL_THREADS.
+
+    Args:
+        metric_config: Metric configuration dict
+
+    Returns:
+        Thread count (at least 1)
+    """
+    num_threads = metric_config.get('num_threads') or os.environ.get('DSPY_EVAL_THREADS') or 8
+    return max(1, int(num_threads))
+
+
 # ============================================================================
 # DSPY PROGRAM DEFINITION
 # ============================================================================
@@ -210,8 +269,6 @@ def create_dspy_program(program_type: str = 'predict', initial_instruction: str
     Returns:
         DSPy Module instance
     """
-    import dspy
-
     # Create signature with initial instruction if provided
     if initial_instruction:
         # Create a signature with instructions parameter
@@ -274,7 +331,8 @@ def run_mipro(
     trainset: List,
     valset: List,
     metric: Callable,
-    config: Dict[str, Any]
+    config: Dict[str, Any],
+    num_threads: int = 1
 ) -> Any:
     """
     Run MIPRO/MIPROv2 optimization
@@ -285,13 +343,11 @@ def run_mipro(
         valset: Validation examples
         metric: Evaluation metric
         config: Optimizer configuration
+        num_threads: Number of threads for parallel candidate evaluation
 
     Returns:
         Compiled DSPy program
     """
-    import dspy
-    from dspy.teleprompt import MIPROv2
-
     log_progress("Starting MIPROv2 optimization")
 
     mode = config.get('mode', 'light')
@@ -313,6 +369,7 @@ def run_mipro(
         'max_labeled_demos': max_labeled,
         'verbose': True,
         'track_stats': True,
+        'num_threads': num_threads,
         # Ensure instruction optimization is enabled
         'prompt_model': None,  # Use the same model for generating instruction candidates
     }
@@ -358,9 +415,6 @@ def evaluate_program(
     Returns:
         Average metric score
     """
-    import dspy
-    from dspy.evaluate import Evaluate
-
     log_progress(f"Evaluating ({len(devset)} examples)")
 
     evaluator = Evaluate(
@@ -403,8 +457,6 @@ def extract_optimized_results(compiled_program: Any) -> Dict[str, Any]:
     Returns:
         Dictionary with optimized components
     """
-    import dspy
-
     results = {
         'instructions': {},
         'demos': [],
@@ -414,12 +466,13 @@ def extract_optimized_results(compiled_program: Any) -> Dict[str, Any]:
 
     try:
         # Get the adapter for formatting prompts (DSPy 3.x approach)
-        adapter = None
-        try:
-            from dspy.adapters import ChatAdapter
-            adapter = ChatAdapter()
-        except ImportError:
-            pass
+        adapter = ChatAdapter() if ChatAdapter is not None else None
+
+        # Predictors often share a signature (and demos), so format each
+        # unique combination once: id(signature) -> input placeholders,
+        # (id(signature), demo ids) -> formatted prompt
+        placeholder_cache = {}
+        formatted_cache = {}
 
         # Iterate through all predictors in the program
         for name, module in compiled_program.named_predictors():
@@ -431,11 +484,19 @@ def extract_optimized_results(compiled_program: Any) -> Dict[str, Any]:
             # Method 1: Use adapter to get the full formatted prompt (recommended by DSPy team)
             if adapter and hasattr(module, 'signature'):
                 try:
-                    formatted = adapter.format(
-                        module.signature,
-                        demos=getattr(module, 'demos', []),
-                        inputs={k: f"{{{k}}}" for k in module.signature.input_fields},
-                    )
+                    sig = module.signature
+                    demos = getattr(module, 'demos', [])
+                    format_key = (id(sig), tuple(id(demo) for demo in demos))
+
+                    formatted = formatted_cache.get(format_key)
+                    if formatted is None:
+                        placeholders = placeholder_cache.get(id(sig))
+                        if placeholders is None:
+                            placeholders = {k: "{" + k + "}" for k in sig.input_fields}
+                            placeholder_cache[id(sig)] = placeholders
+                        formatted = adapter.format(sig, demos=demos, inputs=placeholders)
+                        formatted_cache[format_key] = formatted
+
                     if formatted:
                         # The formatted prompt contains the full optimized instruction
                         results['formatted_prompts'][name] = formatted
@@ -470,12 +531,15 @@ def extract_optimized_results(compiled_program: Any) -> Dict[str, Any]:
                 demo_count = len(module.demos)
                 predictor_info['demo_count'] = demo_count
 
-                # Extract up to 10 demos for display
-                for i, demo in enumerate(module.demos[:10]):
+                # Extract a few demos for display, stopping at the program-wide cap
+                remaining = MAX_DEMOS - len(results['demos'])
+                for demo in module.demos[:min(MAX_DEMOS_PER_PREDICTOR, remaining)]:
+                    demo_input = getattr(demo, 'question', '')
+                    demo_output = getattr(demo, 'answer', '')
                     demo_dict = {
                         'predictor': name,
-                        'input': str(demo.question) if hasattr(demo, 'question') else '',
-                        'output': str(demo.answer) if hasattr(demo, 'answer') else ''
+                        'input': demo_input if isinstance(demo_input, str) else str(demo_input),
+                        'output': demo_output if isinstance(demo_output, str) else str(demo_output)
                     }
                     results['demos'].append(demo_dict)
 
@@ -489,6 +553,8 @@ def extract_optimized_results(compiled_program: Any) -> Dict[str, Any]:
 
     except Exception as e:
         log_progress(f"Warning: Could not fully extract results: {str(e)}")
+        if DEBUG:
+            log_progress(f"Traceback: {traceback.format_exc()}")
 
     return results
 
@@ -508,8 +574,6 @@ def save_compiled_program(compiled_program: Any, save_path: str) -> str:
     Returns:
         Absolute path where program was saved
     """
-    import os
-
     try:
         # Create directory if it doesn't exist
         os.makedirs(save_path, exist_ok=True)
@@ -547,11 +611,10 @@ def optimize_prompt(config: Dict[str, Any], progress_callback: Optional[Callable
             progress_callback(message)
 
     try:
-        # Step 1: Import DSPy (check if installed)
-        try:
-            import dspy
-        except ImportError as e:
-            error_details = traceback.format_exc()
+        # Step 1: Check DSPy is installed (imported at module load)
+        if dspy is None:
+            e = _DSPY_IMPORT_ERROR
+            error_details = ''.join(traceback.format_exception(type(e), e, e.__traceback__))
             print(f"DSPy Import Error: {str(e)}")
             print(f"DSPy Import Error Traceback: {error_details}")
             return {
@@ -587,6 +650,7 @@ def optimize_prompt(config: Dict[str, Any], progress_callback: Optional[Callable
 
         # Step 4: Create metric
         metric = create_metric(config['metric_config'])
+        num_threads = resolve_num_threads(config['metric_config'])
 
         # Step 5: Create DSPy program with initial instruction
         program_type = config.get('program_type', 'predict')
@@ -599,7 +663,7 @@ def optimize_prompt(config: Dict[str, Any], progress_callback: Optional[Callable
 
         if optimizer_type in ['MIPRO', 'MIPROv2']:
             compiled_program = run_mipro(
-                program, trainset, valset, metric, optimizer_config
+                program, trainset, valset, metric, optimizer_config, num_threads
             )
         else:
             return {
@@ -608,7 +672,7 @@ def optimize_prompt(config: Dict[str, Any], progress_callback: Optional[Callable
             }
 
         # Step 7: Evaluate compiled program
-        validation_score = evaluate_program(compiled_program, valset, metric)
+        validation_score = evaluate_program(compiled_program, valset, metric, num_threads)
 
         # Step 8: Extract results
         extracted_results = extract_optimized_results(compiled_program)
@@ -656,105 +720,127 @@ def optimize_prompt(config: Dict[str, Any], progress_callback: Optional[Callable
         }
 
 
-def main():
-    """Main optimization workflow"""
-
-    try:
-        # Step 1: Read configuration from stdin
-        config_json = sys.stdin.read()
-
-        if not config_json or not config_json.strip():
-            raise ValueError("No configuration received on stdin")
+def run_job(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run one optimization job received on stdin
 
-        config = json.loads(config_json)
+    Args:
+        config: Configuration dictionary
 
-        # Step 2: Import DSPy (check if installed)
-        try:
-            import dspy
-        except ImportError as e:
-            raise ImportError(
-                "DSPy library not found. Please install it with: pip install dspy-ai"
-            )
+    Returns:
+        Success result message
+    """
+    # Step 2: Check DSPy is installed (imported at module load)
+    if dspy is None:
+        raise ImportError(
+            "DSPy library not found. Please install it with: pip install dspy-ai"
+        )
 
-        # Step 3: Setup language model
-        log_progress("Initializing optimizer")
-        lm = setup_language_model(config['model_config'])
+    # Step 3: Setup language model
+    log_progress("Initializing optimizer")
+    lm = setup_language_model(config['model_config'])
 
-        # Step 4: Prepare datasets
-        trainset = prepare_dataset(config['train_dataset'], 'train_dataset')
+    # Step 4: Prepare datasets
+    trainset = prepare_dataset(config['train_dataset'], 'train_dataset')
 
-        # Handle validation set
-        if 'val_dataset' in config and config['val_dataset']:
-            valset = prepare_dataset(config['val_dataset'], 'val_dataset')
+    # Handle validation set
+    if 'val_dataset' in config and config['val_dataset']:
+        valset = prepare_dataset(config['val_dataset'], 'val_dataset')
+    else:
+        # Auto-split: 80% train, 20% val
+        split_idx = int(len(trainset) * 0.8)
+        if split_idx < len(trainset):
+            valset = trainset[split_idx:]
+            trainset = trainset[:split_idx]
+            log_progress(f"Using {len(trainset)} training examples, {len(valset)} validation examples")
         else:
-            # Auto-split: 80% train, 20% val
-            split_idx = int(len(trainset) * 0.8)
-            if split_idx < len(trainset):
-                valset = trainset[split_idx:]
-                trainset = trainset[:split_idx]
-                log_progress(f"Using {len(trainset)} training examples, {len(valset)} validation examples")
-            else:
-                # Dataset too small, use all for train and val
-                valset = trainset
-                log_progress(f"Using {len(trainset)} examples for training and validation")
-
-        # Step 5: Create metric
-        metric = create_metric(config['metric_config'])
-
-        # Step 6: Create DSPy program with initial instruction
-        program_type = config.get('program_type', 'predict')
-        initial_instruction = config.get('initial_instruction', '')
-        program = create_dspy_program(program_type, initial_instruction)
+            # Dataset too small, use all for train and val
+            valset = trainset
+            log_progress(f"Using {len(trainset)} examples for training and validation")
+
+    # Step 5: Create metric
+    metric = create_metric(config['metric_config'])
+    num_threads = resolve_num_threads(config['metric_config'])
+
+    # Step 6: Create DSPy program with initial instruction
+    program_type = config.get('program_type', 'predict')
+    initial_instruction = config.get('initial_instruction', '')
+    program = create_dspy_program(program_type, initial_instruction)
+
+    # Step 7: Run optimization (MIPROv2 for instruction optimization)
+    optimizer_type = config.get('optimizer', 'MIPROv2')
+    optimizer_config = config.get('optimizer_config', {})
+
+    if optimizer_type in ['MIPRO', 'MIPROv2']:
+        compiled_program = run_mipro(
+            program, trainset, valset, metric, optimizer_config, num_threads
+        )
+    else:
+        raise ValueError(f"Unknown optimizer: {optimizer_type}. Use 'MIPROv2' for instruction optimization.")
+
+    # Step 8: Evaluate compiled program
+    validation_score = evaluate_program(compiled_program, valset, metric, num_threads)
+
+    # Step 9: Extract results
+    extracted_results = extract_optimized_results(compiled_program)
+
+    # Step 10: Save compiled program
+    save_path = config.get('save_path', './dspy_compiled_program')
+    saved_path = save_compiled_program(compiled_program, save_path)
+
+    # Step 11: Return success result
+    log_progress(f"Complete ({(validation_score * 100):.1f}% score)")
+
+    success_result = {
+        'type': 'success',
+        'validation_score': float(validation_score),
+        'optimized_signature': extracted_results['instructions'],
+        'optimized_demos': extracted_results['demos'],
+        'predictors': extracted_results['predictors'],
+        'compiled_program_path': saved_path,
+        'dataset_sizes': {
+            'train': len(trainset),
+            'val': len(valset)
+        },
+        'optimizer': optimizer_type,
+        'program_type': program_type
+    }
 
-        # Step 7: Run optimization (MIPROv2 for instruction optimization)
-        optimizer_type = config.get('optimizer', 'MIPROv2')
-        optimizer_config = config.get('optimizer_config', {})
+    return success_result
 
-        if optimizer_type in ['MIPRO', 'MIPROv2']:
-            compiled_program = run_mipro(
-                program, trainset, valset, metric, optimizer_config
-            )
-        else:
-            raise ValueError(f"Unknown optimizer: {optimizer_type}. Use 'MIPROv2' for instruction optimization.")
 
-        # Step 8: Evaluate compiled program
-        validation_score = evaluate_program(compiled_program, valset, metric)
+def main():
+    """
+    Main optimization workflow
 
-        # Step 9: Extract results
-        extracted_results = extract_optimized_results(compiled_program)
+    With --serve the worker stays alive and runs one job per message until
+    stdin closes, so the DSPy import cost is paid once across jobs.
+    """
+    persistent = '--serve' in sys.argv[1:]
 
-        # Step 10: Save compiled program
-        save_path = config.get('save_path', './dspy_compiled_program')
-        saved_path = save_compiled_program(compiled_program, save_path)
+    while True:
+        try:
+            # Step 1: Read configuration from stdin
+            config = recv(persistent=persistent)
 
-        # Step 11: Return success result
-        log_progress(f"Complete ({(validation_score * 100):.1f}% score)")
+            if not config:
+                if persistent:
+                    break
+                raise ValueError("No configuration received on stdin")
 
-        success_result = {
-            'type': 'success',
-            'validation_score': float(validation_score),
-            'optimized_signature': extracted_results['instructions'],
-            'optimized_demos': extracted_results['demos'],
-            'predictors': extracted_results['predictors'],
-            'compiled_program_path': saved_path,
-            'dataset_sizes': {
-                'train': len(trainset),
-                'val': len(valset)
-            },
-            'optimizer': optimizer_type,
-            'program_type': program_type
-        }
+            send(run_job(config), flush_now=True)
 
-        print(json.dumps(success_result), flush=True)
-        sys.exit(0)
+        except Exception as e:
+            # Catch all exceptions and return error
+            error_msg = str(e)
+            error_trace = traceback.format_exc()
 
-    except Exception as e:
-        # Catch all exceptions and return error
-        error_msg = str(e)
-        error_trace = traceback.format_exc()
+            log_error(error_msg, error_trace)
+            if not persistent:
+                sys.exit(1)
 
-        log_error(error_msg, error_trace)
-        sys.exit(1)
+        if not persistent:
+            sys.exit(0)
 
 
 if __name__ == '__main__':
@@ -3,9 +3,10 @@
 GEPA (MLflow) Optimization Worker
 Runs MLflow GEPA prompt optimization and returns results to Node.js
 
-Communication Protocol:
+Communication Protocol (see wire.py):
 - Input: JSON configuration via stdin
 - Output: JSON messages via stdout (line-delimited)
+- Set WORKER_WIRE_FORMAT=msgpack for length-prefixed msgpack in both directions
 
 Message Types:
 - {'type': 'progress', 'message': '...', 'data': {...}}
@@ -14,19 +15,66 @@ Message Types:
 """
 
 import sys
-import json
 import os
 import tempfile
-from typing import List, Dict, Any, Callable, Optional
+import pathlib
+import asyncio
+import hashlib
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Callable, Optional, Tuple, Union
 import traceback
+import functools
+import importlib.util
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from wire import send, send_progress, recv
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    import mlflow
+    from mlflow.genai.optimize import GepaPromptOptimizer
+    from mlflow.genai.scorers import Correctness, Safety, scorer
+    _MLFLOW_IMPORT_ERROR = None
+except ImportError as e:
+    mlflow = None
+    GepaPromptOptimizer = None
+    Correctness = None
+    Safety = None
+    scorer = None
+    _MLFLOW_IMPORT_ERROR = e
+
+# Provider SDKs are optional and only imported once a job uses them
+_LAZY: Dict[str, Any] = {}
+
+
+def _lazy(module_name: str) -> Any:
+    """Import module_name on first use and return the cached module afterwards"""
+    module = _LAZY.get(module_name)
+    if module is None:
+        module = _LAZY[module_name] = sys.modules.get(module_name) or importlib.import_module(module_name)
+    return module
+
+
+# {{placeholder}} markers in prompt templates; the same pattern MLflow's
+# PromptVersion.format uses, so whitespace inside the braces is allowed
+_PLACEHOLDER_RE = re.compile(r'\{\{\s*(.*?)\s*\}\}')
 
 
 def log_progress(message: str, data: Optional[Dict] = None):
     """Send progress message to Node.js"""
-    progress = {'type': 'progress', 'message': message}
-    if data:
-        progress['data'] = data
-    print(json.dumps(progress), flush=True)
+    send_progress(message, data)
 
 
 def log_error(message: str, tb: Optional[str] = None):
@@ -34,17 +82,271 @@ def log_error(message: str, tb: Optional[str] = None):
     error = {'type': 'error', 'message': message}
     if tb:
         error['traceback'] = tb
-    print(json.dumps(error), flush=True)
+    send(error, flush_now=True)
+
+
+# ============================================================================
+# RESPONSE CACHE
+# ============================================================================
+
+class _SQLiteLLMCache:
+    """
+    Persistent prompt -> response cache backed by SQLite
+
+    GEPA re-evaluates the same (prompt, input) pairs many times while mutating
+    candidates, so identical calls are answered from disk instead of the provider.
+    Recent entries are also kept in an in-memory LRU so repeat hits within a
+    run skip the SQLite query.
+    """
+
+    def __init__(self, db_path: str, ttl: Optional[float] = None, memory_size: int = 2048):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.memory_size = memory_size
+        self._memory: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS llm_cache ('
+            'key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)'
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(
+        model_config: Dict[str, Any],
+        temperature: float,
+        formatted_prompt: str,
+        mode: str = ''
+    ) -> str:
+        """
+        Hash the call parameters into a cache key (xxh3 when available, else blake2b)
+
+        The provider and api_base are part of the key because the same model
+        name can be served by different backends (a local Ollama model vs a
+        LiteLLM provider, two OpenAI-compatible endpoints) that must not share
+        answers. mode separates responses produced differently for the same
+        prompt (e.g. 'multi_item' answers extracted from a combined prompt).
+        The cache file is shared by every request the server handles, so a
+        digest of the caller's API key scopes entries to one credential (the
+        raw key is never stored): another user's key, or a revoked one, never
+        receives answers paid for with a different key.
+        """
+        api_key = model_config.get('api_key') or ''
+        key_id = hashlib.blake2b(api_key.encode('utf-8'), digest_size=16).hexdigest() if api_key else ''
+        raw = (
+            f"{model_config.get('provider', 'ollama')}|{model_config.get('api_base') or ''}|{key_id}|"
+            f"{model_config.get('model')}|{temperature}|{mode}|{formatted_prompt}"
+        ).encode('utf-8')
+        if xxhash is not None:
+            return xxhash.xxh3_128_hexdigest(raw)
+        return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+    def _remember(self, key: str, response: str, created_at: float):
+        """Add an entry to the in-memory LRU (caller holds the lock)"""
+        self._memory[key] = (response, created_at)
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on a miss"""
+        try:
+            with self._lock:
+                row = self._memory.get(key)
+                if row is not None:
+                    self._memory.move_to_end(key)
+                else:
+                    row = self._conn.execute(
+                        'SELECT response, created_at FROM llm_cache WHERE key = ?', (key,)
+                    ).fetchone()
+                    if row is not None:
+                        self._remember(key, row[0], row[1])
+        except sqlite3.Error:
+            return None
+
+        if row is None:
+            return None
+
+        response, created_at = row
+        if self.ttl is not None and time.time() - created_at > self.ttl:
+            return None
+        return response
+
+    def update(self, key: str, value: str):
+        """Store a response for key"""
+        created_at = time.time()
+        try:
+            with self._lock:
+                self._remember(key, value, created_at)
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO llm_cache (key, response, created_at) VALUES (?, ?, ?)',
+                    (key, value, created_at)
+                )
+                self._conn.commit()
+        except sqlite3.Error:
+            pass  # A failed cache write must never fail the prediction
+
+
+_llm_cache = None
+_llm_cache_loaded = False
+
+
+def load_cache() -> Optional[_SQLiteLLMCache]:
+    """
+    Open the process-wide response cache
+
+    Configured via environment variables:
+        GEPA_CACHE_DB: SQLite file path (default: <tempdir>/gepa_llm_cache.sqlite).
+                       Set to an empty string or 'off' to disable caching; point it
+                       at a new file to invalidate previous entries. The file is
+                       shared by all requests; entries are scoped per API key.
+        GEPA_CACHE_TTL: Optional entry lifetime in seconds
+
+    Returns:
+        Cache instance, or None if caching is disabled or unavailable
+    """
+    global _llm_cache, _llm_cache_loaded
+
+    if _llm_cache_loaded:
+        return _llm_cache
+    _llm_cache_loaded = True
+
+    db_path = os.environ.get('GEPA_CACHE_DB', os.path.join(tempfile.gettempdir(), 'gepa_llm_cache.sqlite'))
+    if not db_path or db_path.lower() == 'off':
+        return None
+
+    ttl = os.environ.get('GEPA_CACHE_TTL')
+    try:
+        _llm_cache = _SQLiteLLMCache(db_path, ttl=float(ttl) if ttl else None)
+    except (sqlite3.Error, ValueError) as e:
+        log_progress(f"Response cache disabled: {str(e)}")
+        _llm_cache = None
+
+    return _llm_cache
+
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def _get_embedder():
+    """Load the sentence embedding model once per process"""
+    global _embedder
+
+    with _embedder_lock:
+        if _embedder is None:
+            from sentence_transformers import SentenceTransformer
+            model_name = os.environ.get('GEPA_SEMANTIC_CACHE_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
+            _embedder = SentenceTransformer(model_name, device='cpu')
+        return _embedder
+
+
+class _SemanticLLMCache:
+    """
+    In-memory nearest-neighbour response cache
+
+    On an exact-cache miss, a prompt whose embedding has cosine similarity
+    >= threshold with an earlier prompt reuses that prompt's response. Entries
+    are evicted least-recently-used once max_entries is reached.
+    """
+
+    def __init__(self, threshold: float = 0.97, max_entries: int = 10000):
+        import faiss
+        import numpy as np
+
+        self._np = np
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._encoder = _get_embedder()
+        dim = self._encoder.get_sentence_embedding_dimension()
+        # Inner product over normalized vectors == cosine similarity
+        self._index = faiss.IndexIDMap(faiss.IndexFlatIP(dim))
+        self._entries = OrderedDict()  # id -> response, oldest first
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def embed(self, prompt: str):
+        """Encode a prompt as a normalized float32 row vector"""
+        vector = self._encoder.encode([prompt], normalize_embeddings=True)
+        return self._np.asarray(vector, dtype='float32')
+
+    def lookup(self, vector) -> Optional[str]:
+        """Return the response of the most similar cached prompt, or None"""
+        with self._lock:
+            if not self._entries:
+                return None
+            scores, ids = self._index.search(vector, 1)
+            entry_id = int(ids[0][0])
+            if entry_id < 0 or scores[0][0] < self.threshold:
+                return None
+            self._entries.move_to_end(entry_id)
+            return self._entries[entry_id]
+
+    def update(self, vector, response: str):
+        """Store a response under the prompt embedding"""
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                oldest_id, _ = self._entries.popitem(last=False)
+                self._index.remove_ids(self._np.array([oldest_id], dtype='int64'))
+
+            entry_id = self._next_id
+            self._next_id += 1
+            self._index.add_with_ids(vector, self._np.array([entry_id], dtype='int64'))
+            self._entries[entry_id] = response
+
+
+def load_semantic_cache() -> Optional[_SemanticLLMCache]:
+    """
+    Create a semantic response cache for one predict function
+
+    Disabled by default because it returns approximate matches. Configured via:
+        GEPA_SEMANTIC_CACHE: Set to 'true' to enable (requires sentence-transformers and faiss)
+        GEPA_SEMANTIC_CACHE_THRESHOLD: Minimum cosine similarity for a hit (default: 0.97)
+        GEPA_SEMANTIC_CACHE_SIZE: Maximum number of entries (default: 10000)
+        GEPA_SEMANTIC_CACHE_MODEL: Embedding model (default: sentence-transformers/all-MiniLM-L6-v2)
+
+    Returns:
+        Cache instance, or None if disabled or dependencies are missing
+    """
+    if os.environ.get('GEPA_SEMANTIC_CACHE', 'false').lower() != 'true':
+        return None
+
+    try:
+        return _SemanticLLMCache(
+            threshold=float(os.environ.get('GEPA_SEMANTIC_CACHE_THRESHOLD', '0.97')),
+            max_entries=int(os.environ.get('GEPA_SEMANTIC_CACHE_SIZE', '10000'))
+        )
+    except ImportError as e:
+        log_progress(f"Semantic cache disabled: {str(e)}")
+        return None
 
 
 # ============================================================================
 # LANGUAGE MODEL CONFIGURATION
 # ============================================================================
 
+# Shared connection limits for provider HTTP clients; HTTP/2 needs the h2 package
+# (idle connections are kept for 5 minutes, across GEPA's slower reflection steps)
+_HTTP_LIMITS = {'max_connections': 64, 'max_keepalive_connections': 32, 'keepalive_expiry': 300.0}
+_HTTP2 = importlib.util.find_spec('h2') is not None
+
+
+def _pooled_http_client():
+    """Create a keep-alive httpx client for an OpenAI/Anthropic SDK instance"""
+    httpx = _lazy('httpx')
+    return httpx.Client(http2=_HTTP2, limits=httpx.Limits(**_HTTP_LIMITS))
+
+
 def get_model_client(config: Dict[str, Any]):
     """
     Get appropriate model client based on provider
 
+    OpenAI and Anthropic SDK instances are cached per (provider, api_key,
+    api_base), so every predictor for the same account shares one client and
+    its pooled keep-alive connections.
+
     Args:
         config: {
             'provider': 'ollama' | 'openai' | 'anthropic' | 'google' | 'gemini' | any LiteLLM-supported provider,
@@ -57,49 +359,353 @@ def get_model_client(config: Dict[str, Any]):
         Configured client instance or config dict for LiteLLM fallback
     """
     provider = config.get('provider', 'ollama')
-    api_key = config.get('api_key', '')
-    api_base = config.get('api_base')
+    factory = _CLIENT_FACTORIES.get(provider, _litellm_client_info)
+    return factory(provider, config)
+
+
+def _openai_client_info(provider: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    return {'type': 'openai', 'client': _sdk_client(provider, config.get('api_key', ''), config.get('api_base'))}
+
+
+def _anthropic_client_info(provider: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    api_key = config.get('api_key', '') or os.environ.get('ANTHROPIC_API_KEY', '')
+    return {'type': 'anthropic', 'client': _sdk_client(provider, api_key, config.get('api_base'))}
+
+
+def _google_client_info(provider: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    api_key = config.get('api_key', '') or os.environ.get('GOOGLE_API_KEY', '')
+    return {'type': 'google', 'client': _configured_genai(api_key)}
+
+
+def _litellm_client_info(provider: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    # Use LiteLLM for all other providers (ollama, azure, cohere, etc.)
+    return {
+        'type': 'litellm',
+        'provider': provider,
+        'model': config.get('model'),
+        'api_key': config.get('api_key', ''),
+        'api_base': config.get('api_base')
+    }
+
+
+# Native client support for best compatibility; anything else goes through LiteLLM
+_CLIENT_FACTORIES = {
+    'openai': _openai_client_info,
+    'anthropic': _anthropic_client_info,
+    'google': _google_client_info,
+    'gemini': _google_client_info,
+}
+
+
+_genai_api_key = None
+
+
+def _configured_genai(api_key: str):
+    """google.generativeai, configured for api_key (configure is global, so only rerun on key changes)"""
+    global _genai_api_key
+
+    genai = _lazy('google.generativeai')
+    if api_key and api_key != _genai_api_key:
+        genai.configure(api_key=api_key)
+        _genai_api_key = api_key
+    return genai
+
+
+def _warm_up_client(client_info: Dict[str, Any]):
+    """
+    Open a pooled connection to the provider in the background
+
+    The first metric call otherwise pays the TCP + TLS handshake. A cheap
+    models.list() request on the shared SDK client leaves a keep-alive
+    connection in its pool; failures are ignored (the real call reports them).
+
+    Args:
+        client_info: Result of get_model_client
+    """
+    if client_info.get('type') not in ('openai', 'anthropic'):
+        return
+
+    client = client_info.get('client')
+    models = getattr(client, 'models', None)
+    if models is None or not hasattr(models, 'list'):
+        return
+
+    def warm_up():
+        try:
+            models.list()
+        except Exception:
+            pass
+
+    threading.Thread(target=warm_up, name='client-warmup', daemon=True).start()
+
+
+@functools.lru_cache(maxsize=16)
+def _sdk_client(provider: str, api_key: str, api_base: Optional[str]):
+    """Create an OpenAI/Anthropic SDK client with a pooled HTTP client (cached)"""
+    client_config = {'http_client': _pooled_http_client()}
+    if api_key:
+        client_config['api_key'] = api_key
 
-    # Native client support for best compatibility
     if provider == 'openai':
-        import openai
-        client_config = {}
-        if api_key:
-            client_config['api_key'] = api_key
+        openai = _lazy('openai')
         if api_base:
             client_config['base_url'] = api_base
-        return {'type': 'openai', 'client': openai.OpenAI(**client_config)}
+        return openai.OpenAI(**client_config)
 
-    elif provider == 'anthropic':
-        import anthropic
-        client_config = {}
-        if api_key:
-            client_config['api_key'] = api_key
-        else:
-            api_key = os.environ.get('ANTHROPIC_API_KEY', '')
-            if api_key:
-                client_config['api_key'] = api_key
-        return {'type': 'anthropic', 'client': anthropic.Anthropic(**client_config)}
+    anthropic = _lazy('anthropic')
+    return anthropic.Anthropic(**client_config)
 
-    elif provider in ['google', 'gemini']:
-        import google.generativeai as genai
-        if api_key:
-            genai.configure(api_key=api_key)
-        else:
-            api_key = os.environ.get('GOOGLE_API_KEY', '')
-            if api_key:
-                genai.configure(api_key=api_key)
-        return {'type': 'google', 'client': genai}
 
+@functools.lru_cache(maxsize=16)
+def _async_sdk_client(provider: str, api_key: str, api_base: Optional[str]):
+    """
+    Create an AsyncOpenAI/AsyncAnthropic client with a pooled HTTP client (cached)
+
+    Async clients are only used on the shared predict loop, so one instance
+    per account is reused by every job in the process.
+    """
+    httpx = _lazy('httpx')
+    client_config = {'http_client': httpx.AsyncClient(http2=_HTTP2, limits=httpx.Limits(**_HTTP_LIMITS))}
+    if api_key:
+        client_config['api_key'] = api_key
+
+    if provider == 'openai':
+        openai = _lazy('openai')
+        if api_base:
+            client_config['base_url'] = api_base
+        return openai.AsyncOpenAI(**client_config)
+
+    anthropic = _lazy('anthropic')
+    return anthropic.AsyncAnthropic(**client_config)
+
+
+# A fixed prompt prefix, or a function returning the prefix of the template
+# currently being evaluated (GEPA swaps candidates during optimization)
+StaticPrefix = Union[str, Callable[[], str]]
+
+
+def _anthropic_content(formatted_prompt: str, static_prefix: StaticPrefix) -> Any:
+    """
+    Message content with the static template prefix marked cacheable
+
+    Everything before the input placeholder is identical across dataset rows,
+    so Anthropic prompt caching can skip re-processing it. Prompts that don't
+    start with the prefix (e.g. the template changed mid-call) are sent as-is.
+    """
+    prefix = static_prefix() if callable(static_prefix) else static_prefix
+    if prefix and len(formatted_prompt) > len(prefix) and formatted_prompt.startswith(prefix):
+        # Mark the static template prefix as cacheable, send the input separately
+        return [
+            {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": formatted_prompt[len(prefix):]}
+        ]
+    return formatted_prompt
+
+
+def _openai_backend(client_info: Dict[str, Any], model_id: str, temperature: float, static_prefix: StaticPrefix) -> Callable[[str], str]:
+    client = client_info['client']
+
+    def call_model(formatted_prompt: str) -> str:
+        completion = client.chat.completions.create(
+            model=model_id,
+            messages=[{"role": "user", "content": formatted_prompt}],
+            temperature=temperature
+        )
+        return completion.choices[0].message.content
+
+    return call_model
+
+
+def _anthropic_backend(client_info: Dict[str, Any], model_id: str, temperature: float, static_prefix: StaticPrefix) -> Callable[[str], str]:
+    client = client_info['client']
+
+    def call_model(formatted_prompt: str) -> str:
+        message = client.messages.create(
+            model=model_id,
+            max_tokens=1024,
+            messages=[{"role": "user", "content": _anthropic_content(formatted_prompt, static_prefix)}],
+            temperature=temperature
+        )
+        return message.content[0].text
+
+    return call_model
+
+
+def _google_backend(client_info: Dict[str, Any], model_id: str, temperature: float, static_prefix: StaticPrefix) -> Callable[[str], str]:
+    # Build the SDK model object once, not per prediction
+    model = client_info['client'].GenerativeModel(model_id)
+
+    def call_model(formatted_prompt: str) -> str:
+        response = model.generate_content(formatted_prompt)
+        return response.text
+
+    return call_model
+
+
+def _litellm_backend(client_info: Dict[str, Any], model_id: str, temperature: float, static_prefix: StaticPrefix) -> Callable[[str], str]:
+    # Use LiteLLM for universal provider support
+    litellm = _lazy('litellm')
+
+    # Build model string (provider/model)
+    provider = client_info['provider']
+    model_string = f"{provider}/{model_id}"
+
+    # Pass credentials per request instead of through the process environment
+    litellm_kwargs = {}
+    if client_info.get('api_key'):
+        litellm_kwargs['api_key'] = client_info['api_key']
+    if client_info.get('api_base'):
+        litellm_kwargs['api_base'] = client_info['api_base']
+
+    def call_model(formatted_prompt: str) -> str:
+        response = litellm.completion(
+            model=model_string,
+            messages=[{"role": "user", "content": formatted_prompt}],
+            temperature=temperature,
+            **litellm_kwargs
+        )
+        return response.choices[0].message.content
+
+    return call_model
+
+
+# Client type (from get_model_client) -> model call factory
+_PREDICT_BACKENDS = {
+    'openai': _openai_backend,
+    'anthropic': _anthropic_backend,
+    'google': _google_backend,
+    'litellm': _litellm_backend,
+}
+
+
+def _make_model_caller(
+    client_info: Dict[str, Any],
+    model_id: str,
+    temperature: float = 0.0,
+    static_prefix: StaticPrefix = ''
+) -> Callable[[str], str]:
+    """
+    Build a (formatted prompt) -> response function for one model
+
+    The backend is looked up once here; the returned function calls its
+    provider's API directly, with no dispatch on every prediction.
+
+    Args:
+        client_info: Result of get_model_client
+        model_id: Model name
+        temperature: Sampling temperature
+        static_prefix: Prompt prefix shared by every request (or a function
+                       returning it), marked cacheable for Anthropic
+
+    Returns:
+        Model call function
+
+    Raises:
+        ValueError: If the client type has no backend
+    """
+    client_type = client_info.get('type')
+    backend = _PREDICT_BACKENDS.get(client_type)
+    if backend is None:
+        raise ValueError(f"Unsupported client type: {client_type}")
+    return backend(client_info, model_id, temperature, static_prefix)
+
+
+def _compile_template(prompt_template: str, input_key: str) -> Tuple[Callable[[str], str], str]:
+    """
+    Specialize prompt formatting for a template once, at construction time
+
+    Args:
+        prompt_template: Prompt template with {{placeholders}}
+        input_key: Name of the placeholder filled with the row input
+
+    Returns:
+        (format function: (input_value: str) -> str, static prefix before the
+        first placeholder)
+    """
+    placeholder = f'{{{{{input_key}}}}}'
+    prefix, sep, suffix = prompt_template.partition(placeholder)
+
+    if not sep:
+        # No placeholder: every row gets the same prompt
+        def format_input(input_value: str) -> str:
+            return prompt_template
+    elif placeholder not in suffix:
+        def format_input(input_value: str) -> str:
+            return prefix + input_value + suffix
     else:
-        # Use LiteLLM for all other providers (ollama, azure, cohere, etc.)
-        return {
-            'type': 'litellm',
-            'provider': provider,
-            'model': config.get('model'),
-            'api_key': api_key,
-            'api_base': api_base
-        }
+        segments = tuple(prompt_template.split(placeholder))
+
+        def format_input(input_value: str) -> str:
+            return input_value.join(segments)
+
+    return format_input, prefix
+
+
+def _with_response_cache(
+    call_model: Callable[[str], str],
+    model_config: Dict[str, Any],
+    temperature: float,
+    cache: Optional[_SQLiteLLMCache],
+    semantic_cache: Optional[_SemanticLLMCache] = None,
+    mode: str = ''
+) -> Callable[[str], str]:
+    """
+    Wrap a model call with the enabled response caches
+
+    Lookups go exact match -> semantic -> provider. Which caches are enabled
+    is settled here, so the returned function has no per-call checks for them.
+    Only provider responses are written to the exact cache: a semantic hit is
+    an approximate answer, and persisting it under the new prompt's exact key
+    would keep serving it after the semantic cache is turned off.
+
+    Args:
+        call_model: (formatted prompt) -> response
+        model_config: Model configuration dict (provider, api_base and model
+                      are part of the exact-match key)
+        temperature: Sampling temperature (part of the exact-match key)
+        cache: Exact-match cache, or None
+        semantic_cache: Semantic cache, or None
+        mode: How call_model produces responses (part of the exact-match key)
+
+    Returns:
+        Cached model call function
+    """
+    if semantic_cache is None:
+        if cache is None:
+            return call_model
+
+        def lookup_call(formatted_prompt: str) -> Tuple[Optional[str], bool]:
+            return call_model(formatted_prompt), True
+    else:
+        def lookup_call(formatted_prompt: str) -> Tuple[Optional[str], bool]:
+            """(response, whether it came from the provider)"""
+            vector = semantic_cache.embed(formatted_prompt)
+            cached = semantic_cache.lookup(vector)
+            if cached is not None:
+                return cached, False
+            result = call_model(formatted_prompt)
+            if result is not None:
+                semantic_cache.update(vector, result)
+            return result, True
+
+        if cache is None:
+            return lambda formatted_prompt: lookup_call(formatted_prompt)[0]
+
+    make_key = cache.make_key
+    lookup = cache.lookup
+    update = cache.update
+
+    def cached_call(formatted_prompt: str) -> str:
+        key = make_key(model_config, temperature, formatted_prompt, mode)
+        cached = lookup(key)
+        if cached is not None:
+            return cached
+        result, from_provider = lookup_call(formatted_prompt)
+        if from_provider and result is not None:
+            update(key, result)
+        return result
+
+    return cached_call
 
 
 def create_predict_fn(model_config: Dict[str, Any], prompt_template: str, input_key: str = 'question'):
@@ -116,75 +722,817 @@ def create_predict_fn(model_config: Dict[str, Any], prompt_template: str, input_
     """
     model_id = model_config.get('model')
     client_info = get_model_client(model_config)
+    temperature = 0.0
+    cache = load_cache()
+    semantic_cache = load_semantic_cache()
+
+    # Everything before the input placeholder is identical across dataset rows.
+    # Keeping it as the leading part of the request lets provider-side prefix
+    # caching (OpenAI automatic, Anthropic cache_control) skip re-processing it.
+    format_input, static_prefix = _compile_template(prompt_template, input_key)
+
+    # Specialize the model call once here instead of dispatching on every prediction
+    call_model = _make_model_caller(client_info, model_id, temperature, static_prefix)
+
+    # Layer only the caches that are enabled, so predictions don't re-check them
+    cached_call = _with_response_cache(call_model, model_config, temperature, cache, semantic_cache)
 
     def predict_fn(**kwargs) -> str:
-        """Generic prediction function with LiteLLM fallback"""
-        # Get the input value from kwargs
-        input_value = kwargs.get(input_key, '')
-
-        # Format the prompt template with the input
-        formatted_prompt = prompt_template.replace(f'{{{{{input_key}}}}}', input_value)
-
-        # Call the appropriate model based on client type
-        client_type = client_info.get('type')
-
-        if client_type == 'openai':
-            client = client_info['client']
-            completion = client.chat.completions.create(
-                model=model_id,
-                messages=[{"role": "user", "content": formatted_prompt}],
-                temperature=0.0
+        """Cached prediction function"""
+        return cached_call(format_input(kwargs.get(input_key, '')))
+
+    return predict_fn
+
+
+# ============================================================================
+# BATCH API PREDICTION
+# ============================================================================
+
+class _PendingCall:
+    """One queued call waiting for its batch to complete"""
+
+    __slots__ = ('item', 'done', 'result', 'error')
+
+    def __init__(self, item: Any):
+        self.item = item
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def run_predict_parallel(predict_fn: Callable, inputs: List[Any], max_workers: int = 16) -> List[Any]:
+    """
+    Call predict_fn for every input from a thread pool
+
+    Provider calls are I/O-bound and release the GIL while waiting on the
+    socket, so throughput scales with max_workers up to the provider's rate
+    limit.
+
+    Args:
+        predict_fn: Single-input function, e.g. a prompt -> response call
+        inputs: Inputs to map over
+        max_workers: Maximum number of concurrent calls
+
+    Returns:
+        Results in the same order as inputs; a failed call's slot holds its
+        exception
+    """
+    def call(item: Any) -> Any:
+        try:
+            return predict_fn(item)
+        except Exception as e:
+            return e
+
+    if len(inputs) <= 1:
+        return [call(item) for item in inputs]
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(inputs))), thread_name_prefix='predict') as executor:
+        return list(executor.map(call, inputs))
+
+
+class _MicroBatcher:
+    """
+    Group concurrent single-item calls into batches
+
+    MLflow evaluates rows from a thread pool and calls predict_fn once per row.
+    The first caller of a batch waits up to max_wait seconds for other threads
+    to join (or until max_batch_size calls are queued), then runs the whole
+    batch and hands every caller its own result.
+    """
+
+    def __init__(self, run_batch: Callable[[List[Any]], List[Any]], max_batch_size: int = 32, max_wait: float = 0.5):
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max_wait
+        self._cond = threading.Condition()
+        self._open: Optional[List[_PendingCall]] = None
+
+    def submit(self, item: Any) -> Any:
+        """Queue item and block until its batch has run"""
+        call = _PendingCall(item)
+
+        with self._cond:
+            batch = self._open
+            leader = batch is None
+            if leader:
+                batch = self._open = []
+            batch.append(call)
+
+            # A full batch is closed so the next caller starts a new one
+            if len(batch) >= self.max_batch_size:
+                self._open = None
+                self._cond.notify_all()
+
+            if leader:
+                # Collect followers until the batch is full or the window closes
+                deadline = time.monotonic() + self.max_wait
+                while self._open is batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._open = None
+                        break
+                    self._cond.wait(remaining)
+
+        if leader:
+            self._run(batch)
+
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def _run(self, batch: List[_PendingCall]):
+        """Run one batch and wake its callers"""
+        try:
+            results = list(self.run_batch([call.item for call in batch]))
+            if len(results) != len(batch):
+                raise RuntimeError(f"Batch returned {len(results)} results for {len(batch)} calls")
+            for call, result in zip(batch, results):
+                if isinstance(result, Exception):
+                    call.error = result
+                else:
+                    call.result = result
+        except Exception as e:
+            for call in batch:
+                call.error = e
+        finally:
+            for call in batch:
+                call.done.set()
+
+
+class _BatchTimeout(Exception):
+    """A batch job did not finish before its deadline"""
+
+
+class BatchedPredictor:
+    """
+    Prompt -> response function backed by the provider's Batch API
+
+    Concurrent calls are collected by a _MicroBatcher and submitted as one
+    batch job (OpenAI /v1/batches, Anthropic message batches), which is
+    billed at roughly half the synchronous price. The job is polled with
+    exponential backoff and responses are joined back by custom_id.
+    Batch jobs can take minutes to complete, so this is only used when a job
+    opts in with use_batch_api. A job still unfinished after max_batch_time
+    seconds is cancelled and its prompts are sent as direct calls instead.
+    """
+
+    def __init__(
+        self,
+        client_info: Dict[str, Any],
+        model_id: str,
+        temperature: float = 0.0,
+        max_batch_size: int = 32,
+        max_wait: float = 0.5,
+        poll_interval: float = 2.0,
+        max_poll_interval: float = 60.0,
+        max_batch_time: float = 3600.0
+    ):
+        self.client_info = client_info
+        self.client = client_info['client']
+        self.client_type = client_info['type']
+        self.model_id = model_id
+        self.temperature = temperature
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.max_batch_time = max_batch_time
+        self._direct_call: Optional[Callable[[str], str]] = None
+
+        if self.client_type == 'openai':
+            run_batch = self._run_openai_batch
+        elif self.client_type == 'anthropic':
+            run_batch = self._run_anthropic_batch
+        else:
+            raise ValueError(f"Batch API not supported for client type: {self.client_type}")
+
+        self._batcher = _MicroBatcher(self._dedupe(run_batch), max_batch_size, max_wait)
+
+    def __call__(self, formatted_prompt: str) -> str:
+        return self._batcher.submit(formatted_prompt)
+
+    @staticmethod
+    def _dedupe(run_batch: Callable[[List[str]], List[Any]]) -> Callable[[List[str]], List[Any]]:
+        """Send each distinct prompt once per batch"""
+        def run_unique(prompts: List[str]) -> List[Any]:
+            unique = list(dict.fromkeys(prompts))
+            results = dict(zip(unique, run_batch(unique)))
+            return [results[prompt] for prompt in prompts]
+        return run_unique
+
+    def _wait_for(self, retrieve: Callable[[], Any], is_done: Callable[[Any], bool]) -> Any:
+        """
+        Poll a batch job with exponential backoff until is_done
+
+        Raises:
+            _BatchTimeout: If the job is not done after max_batch_time seconds
+        """
+        deadline = time.monotonic() + self.max_batch_time
+        interval = self.poll_interval
+        while True:
+            job = retrieve()
+            if is_done(job):
+                return job
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise _BatchTimeout()
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, self.max_poll_interval)
+
+    def _fall_back(self, job_id: str, cancel: Callable[[], Any], prompts: List[str]) -> List[Any]:
+        """Cancel a batch that timed out and answer its prompts with direct calls"""
+        log_progress(f"Batch {job_id} did not finish within {self.max_batch_time:.0f}s, using direct calls")
+        try:
+            cancel()
+        except Exception:
+            pass  # Already finishing; its results are simply not used
+
+        if self._direct_call is None:
+            self._direct_call = _make_model_caller(self.client_info, self.model_id, self.temperature)
+        return run_predict_parallel(self._direct_call, prompts)
+
+    def _delete_files(self, file_ids: List[Optional[str]]):
+        """Remove batch input/output files from the provider account (best effort)"""
+        for file_id in file_ids:
+            if not file_id:
+                continue
+            try:
+                self.client.files.delete(file_id)
+            except Exception:
+                pass  # A leftover file must never fail the prediction
+
+    def _run_openai_batch(self, prompts: List[str]) -> List[Any]:
+        """Submit prompts as one OpenAI batch job"""
+        from wire import dumps, loads
+
+        lines = []
+        for i, prompt in enumerate(prompts):
+            lines.append(dumps({
+                'custom_id': f'request-{i}',
+                'method': 'POST',
+                'url': '/v1/chat/completions',
+                'body': {
+                    'model': self.model_id,
+                    'messages': [{"role": "user", "content": prompt}],
+                    'temperature': self.temperature
+                }
+            }))
+        batch_file = self.client.files.create(
+            file=('batch.jsonl', '\n'.join(lines).encode('utf-8')),
+            purpose='batch'
+        )
+        # Uploaded and generated files stay in the account until deleted
+        file_ids = [batch_file.id]
+        try:
+            job = self.client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint='/v1/chat/completions',
+                completion_window='24h'
             )
-            return completion.choices[0].message.content
-
-        elif client_type == 'anthropic':
-            client = client_info['client']
-            message = client.messages.create(
-                model=model_id,
-                max_tokens=1024,
-                messages=[{"role": "user", "content": formatted_prompt}],
-                temperature=0.0
+
+            try:
+                job = self._wait_for(
+                    lambda: self.client.batches.retrieve(job.id),
+                    lambda j: j.status in ('completed', 'failed', 'expired', 'cancelled')
+                )
+            except _BatchTimeout:
+                return self._fall_back(job.id, lambda: self.client.batches.cancel(job.id), prompts)
+
+            file_ids += [job.output_file_id, getattr(job, 'error_file_id', None)]
+            if job.status != 'completed' or not job.output_file_id:
+                raise RuntimeError(f"OpenAI batch {job.id} finished with status '{job.status}'")
+
+            # Join responses back by custom_id; missing or failed rows become errors
+            results: Dict[str, Any] = {}
+            for line in self.client.files.content(job.output_file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                row = loads(line)
+                response = row.get('response') or {}
+                if row.get('error') or response.get('status_code') != 200:
+                    results[row['custom_id']] = RuntimeError(f"Batch request failed: {row.get('error') or response}")
+                else:
+                    results[row['custom_id']] = response['body']['choices'][0]['message']['content']
+        finally:
+            self._delete_files(file_ids)
+
+        return [
+            results.get(f'request-{i}', RuntimeError(f"No batch response for request-{i}"))
+            for i in range(len(prompts))
+        ]
+
+    def _run_anthropic_batch(self, prompts: List[str]) -> List[Any]:
+        """Submit prompts as one Anthropic message batch"""
+        job = self.client.messages.batches.create(requests=[
+            {
+                'custom_id': f'request-{i}',
+                'params': {
+                    'model': self.model_id,
+                    'max_tokens': 1024,
+                    'messages': [{"role": "user", "content": prompt}],
+                    'temperature': self.temperature
+                }
+            }
+            for i, prompt in enumerate(prompts)
+        ])
+
+        try:
+            job = self._wait_for(
+                lambda: self.client.messages.batches.retrieve(job.id),
+                lambda j: j.processing_status == 'ended'
             )
-            return message.content[0].text
+        except _BatchTimeout:
+            return self._fall_back(job.id, lambda: self.client.messages.batches.cancel(job.id), prompts)
 
-        elif client_type == 'google':
-            client = client_info['client']
-            model = client.GenerativeModel(model_id)
-            response = model.generate_content(formatted_prompt)
-            return response.text
+        results: Dict[str, Any] = {}
+        for entry in self.client.messages.batches.results(job.id):
+            if entry.result.type == 'succeeded':
+                results[entry.custom_id] = entry.result.message.content[0].text
+            else:
+                results[entry.custom_id] = RuntimeError(f"Batch request {entry.result.type}")
 
-        elif client_type == 'litellm':
-            # Use LiteLLM for universal provider support
-            import litellm
+        return [
+            results.get(f'request-{i}', RuntimeError(f"No batch response for request-{i}"))
+            for i in range(len(prompts))
+        ]
 
-            # Build model string (provider/model)
-            provider = client_info['provider']
-            model_string = f"{provider}/{model_id}"
 
-            # Set up API key and base if provided
-            if client_info.get('api_key'):
-                os.environ[f"{provider.upper()}_API_KEY"] = client_info['api_key']
-            if client_info.get('api_base'):
-                os.environ[f"{provider.upper()}_API_BASE"] = client_info['api_base']
+def create_predict_batch_fn(
+    client_info: Dict[str, Any],
+    model_id: str,
+    temperature: float = 0.0,
+    chunk_size: int = 16
+) -> Callable[[List[str]], List[Any]]:
+    """
+    Create a prompts -> responses function backed by litellm.batch_completion
+
+    Each chunk of prompts goes out as one batch_completion call, which sends
+    the requests concurrently so the server (e.g. Ollama with
+    OLLAMA_NUM_PARALLEL) can process them together.
+
+    Args:
+        client_info: LiteLLM result of get_model_client
+        model_id: Model identifier
+        temperature: Sampling temperature
+        chunk_size: Maximum number of requests per batch_completion call
 
-            response = litellm.completion(
+    Returns:
+        Batch prediction function; a failed request's slot holds its exception
+    """
+    litellm = _lazy('litellm')
+    model_string = f"{client_info['provider']}/{model_id}"
+    chunk_size = max(1, int(chunk_size))
+
+    litellm_kwargs = {}
+    if client_info.get('api_key'):
+        litellm_kwargs['api_key'] = client_info['api_key']
+    if client_info.get('api_base'):
+        litellm_kwargs['api_base'] = client_info['api_base']
+
+    def predict_batch_fn(prompts: List[str]) -> List[Any]:
+        results: List[Any] = []
+        for start in range(0, len(prompts), chunk_size):
+            responses = litellm.batch_completion(
                 model=model_string,
-                messages=[{"role": "user", "content": formatted_prompt}],
-                temperature=0.0
+                messages=[[{"role": "user", "content": prompt}] for prompt in prompts[start:start + chunk_size]],
+                temperature=temperature,
+                **litellm_kwargs
             )
-            return response.choices[0].message.content
+            results.extend(
+                response if isinstance(response, Exception) else response.choices[0].message.content
+                for response in responses
+            )
+        return results
+
+    return predict_batch_fn
+
+
+def create_batched_predictor(
+    model_config: Dict[str, Any],
+    client_info: Optional[Dict[str, Any]] = None,
+    temperature: float = 0.0
+) -> Optional[Callable[[str], str]]:
+    """
+    Create a batching predictor for the model, if its provider supports one
+
+    OpenAI and Anthropic use their Batch APIs. LiteLLM providers have no batch
+    job API, so concurrent calls are grouped and sent with
+    litellm.batch_completion instead.
+
+    Args:
+        model_config: Model configuration dict (optional 'batch_size' and
+                      'batch_wait' tune the micro-batching window,
+                      'batch_timeout' is the seconds to wait for a batch job
+                      before falling back to direct calls)
+        client_info: Result of get_model_client, if already created
+        temperature: Sampling temperature
+
+    Returns:
+        BatchedPredictor, a batch_completion predictor, or None when the
+        provider can't batch (callers fall back to synchronous calls)
+    """
+    provider = model_config.get('provider', 'ollama')
+    if client_info is None:
+        client_info = get_model_client(model_config)
+
+    if client_info['type'] == 'litellm':
+        log_progress(f"Batch API not available for provider '{provider}', grouping calls with litellm.batch_completion")
+        batcher = _MicroBatcher(
+            create_predict_batch_fn(client_info, model_config.get('model'), temperature),
+            max_batch_size=model_config.get('batch_size', 32),
+            max_wait=model_config.get('batch_wait', 0.5)
+        )
+        return batcher.submit
+
+    if client_info['type'] not in ('openai', 'anthropic'):
+        log_progress(f"Batch API not available for provider '{provider}', using synchronous calls")
+        return None
+
+    return BatchedPredictor(
+        client_info,
+        model_config.get('model'),
+        max_batch_size=model_config.get('batch_size', 32),
+        max_wait=model_config.get('batch_wait', 0.5),
+        max_batch_time=model_config.get('batch_timeout', 3600.0),
+        temperature=temperature
+    )
+
+
+# ============================================================================
+# ASYNC PREDICTION
+# ============================================================================
+
+_async_loop = None
+_async_loop_lock = threading.Lock()
+
+_RATE_LIMIT_ERRORS = ('RateLimitError', 'ResourceExhausted')
+
+
+def _get_async_loop() -> asyncio.AbstractEventLoop:
+    """Start the shared background event loop on first use"""
+    global _async_loop
+
+    with _async_loop_lock:
+        if _async_loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name='predict-loop', daemon=True)
+            thread.start()
+            _async_loop = loop
+        return _async_loop
+
+
+def _is_rate_limit(error: Exception) -> bool:
+    """Whether error is a provider rate limit (worth retrying)"""
+    return type(error).__name__ in _RATE_LIMIT_ERRORS or getattr(error, 'status_code', None) == 429
+
+
+class AsyncPredictor:
+    """
+    Prompt -> response function that overlaps provider requests
+
+    Concurrent calls from MLflow's evaluation threads are grouped by a
+    _MicroBatcher and each group is sent with asyncio.gather on one shared
+    background event loop, using the providers' async clients
+    (AsyncOpenAI, AsyncAnthropic, generate_content_async, litellm.acompletion),
+    or blocking calls in a thread pool when the SDK has no async API.
+    A semaphore caps requests in flight, and rate-limited requests are retried
+    with jittered exponential backoff.
+    """
+
+    def __init__(
+        self,
+        model_config: Dict[str, Any],
+        concurrency: int = 8,
+        max_batch_size: int = 32,
+        max_wait: float = 0.05,
+        max_retries: int = 5,
+        temperature: float = 0.0,
+        static_prefix: StaticPrefix = ''
+    ):
+        self.model_id = model_config.get('model')
+        self.temperature = temperature
+        self.static_prefix = static_prefix
+        self.max_retries = max_retries
+        self._loop = _get_async_loop()
+        self._client = None
+        self._call = self._make_call(model_config)
+
+        # Created on the loop that will use it
+        self._semaphore = asyncio.run_coroutine_threadsafe(
+            self._make_semaphore(max(1, int(concurrency))), self._loop
+        ).result()
+
+        self._batcher = _MicroBatcher(self._run_batch, max_batch_size, max_wait)
+
+    def __call__(self, formatted_prompt: str) -> str:
+        return self._batcher.submit(formatted_prompt)
+
+    @staticmethod
+    async def _make_semaphore(concurrency: int) -> asyncio.Semaphore:
+        return asyncio.Semaphore(concurrency)
+
+    def warm_up(self):
+        """Open a pooled connection on the async client, like _warm_up_client"""
+        models = getattr(self._client, 'models', None)
+        if models is None or not hasattr(models, 'list'):
+            return
+
+        async def warm_up():
+            try:
+                await models.list()
+            except Exception:
+                pass
+
+        asyncio.run_coroutine_threadsafe(warm_up(), self._loop)
+
+    def _make_call(self, model_config: Dict[str, Any]) -> Callable:
+        """Build the provider-specific coroutine: (prompt) -> response"""
+        provider = model_config.get('provider', 'ollama')
+        api_key = model_config.get('api_key', '')
+        api_base = model_config.get('api_base')
+        model_id = self.model_id
+        temperature = self.temperature
+        static_prefix = self.static_prefix
+
+        if provider == 'openai':
+            client = self._client = _async_sdk_client(provider, api_key, api_base)
+
+            async def call(prompt: str) -> str:
+                completion = await client.chat.completions.create(
+                    model=model_id,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=temperature
+                )
+                return completion.choices[0].message.content
+
+        elif provider == 'anthropic':
+            api_key = api_key or os.environ.get('ANTHROPIC_API_KEY', '')
+            client = self._client = _async_sdk_client(provider, api_key, api_base)
+
+            async def call(prompt: str) -> str:
+                message = await client.messages.create(
+                    model=model_id,
+                    max_tokens=1024,
+                    messages=[{"role": "user", "content": _anthropic_content(prompt, static_prefix)}],
+                    temperature=temperature
+                )
+                return message.content[0].text
+
+        elif provider in ['google', 'gemini']:
+            client_info = get_model_client(model_config)
+            model = client_info['client'].GenerativeModel(model_id)
+
+            if hasattr(model, 'generate_content_async'):
+                async def call(prompt: str) -> str:
+                    response = await model.generate_content_async(prompt)
+                    return response.text
+            else:
+                # SDK without async support: overlap blocking calls in threads
+                call = self._threaded(_make_model_caller(client_info, model_id, temperature))
 
         else:
-            raise ValueError(f"Unsupported client type: {client_type}")
+            # Use LiteLLM for all other providers (ollama, azure, cohere, etc.)
+            litellm = _lazy('litellm')
+            model_string = f"{provider}/{model_id}"
+            litellm_kwargs = {}
+            if api_key:
+                litellm_kwargs['api_key'] = api_key
+            if api_base:
+                litellm_kwargs['api_base'] = api_base
 
-    return predict_fn
+            async def call(prompt: str) -> str:
+                response = await litellm.acompletion(
+                    model=model_string,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=temperature,
+                    **litellm_kwargs
+                )
+                return response.choices[0].message.content
+
+        return call
+
+    def _threaded(self, sync_call: Callable[[str], str], max_workers: int = 16) -> Callable:
+        """Wrap a blocking prompt -> response call as a coroutine run in a thread pool"""
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='predict')
+        loop = self._loop
+
+        async def call(prompt: str) -> str:
+            return await loop.run_in_executor(executor, sync_call, prompt)
+
+        return call
+
+    async def _predict(self, prompt: str) -> str:
+        """One request, bounded by the semaphore and retried on rate limits"""
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphore:
+                try:
+                    return await self._call(prompt)
+                except Exception as e:
+                    if attempt == self.max_retries or not _is_rate_limit(e):
+                        raise
+            # Back off outside the semaphore so other requests can proceed
+            await asyncio.sleep(random.uniform(0, min(30.0, 2 ** attempt)))
+
+    async def _gather(self, prompts: List[str]) -> List[Any]:
+        return await asyncio.gather(*(self._predict(prompt) for prompt in prompts), return_exceptions=True)
+
+    def _run_batch(self, prompts: List[str]) -> List[Any]:
+        """Run one group of prompts on the background loop"""
+        return asyncio.run_coroutine_threadsafe(self._gather(prompts), self._loop).result()
+
+
+# ============================================================================
+# MULTI-ITEM PROMPTS
+# ============================================================================
+
+_MULTI_ITEM_INSTRUCTIONS = (
+    "Respond to each of the following {count} requests independently. "
+    "Return only a JSON object of the form {{\"answers\": [...]}} containing exactly "
+    "{count} strings, where answers[i] is the complete response to requests[i].\n\n"
+)
+
+
+def _token_counter(model_id: Optional[str]) -> Callable[[str], int]:
+    """Token counting function for model_id (tiktoken if installed, else ~4 chars per token)"""
+    try:
+        import tiktoken
+        try:
+            encoding = tiktoken.encoding_for_model(model_id or '')
+        except KeyError:
+            encoding = tiktoken.get_encoding('cl100k_base')
+        return lambda text: len(encoding.encode(text))
+    except ImportError:
+        return lambda text: len(text) // 4 + 1
+
+
+class MultiItemPredictor:
+    """
+    Prompt -> response function that answers several rows per request
+
+    Concurrent calls are grouped by a _MicroBatcher, packed into one prompt
+    that asks for a JSON array of answers, and split back per row. Groups are
+    capped by a token budget so the combined prompt fits the model's context.
+    If the reply can't be parsed into one answer per row, the rows of that
+    group are sent individually.
+    """
+
+    def __init__(
+        self,
+        call_model: Callable[[str], str],
+        model_id: Optional[str],
+        max_items: int = 10,
+        max_tokens: int = 8000,
+        max_wait: float = 0.05
+    ):
+        self.call_model = call_model
+        self.max_tokens = max_tokens
+        self._count_tokens = _token_counter(model_id)
+        self._batcher = _MicroBatcher(self._run_batch, max_items, max_wait)
+
+    def __call__(self, formatted_prompt: str) -> str:
+        return self._batcher.submit(formatted_prompt)
+
+    def _run_batch(self, prompts: List[str]) -> List[Any]:
+        """Answer a group of prompts in as few requests as the token budget allows"""
+        results: List[Any] = []
+        group: List[str] = []
+        group_tokens = 0
+
+        for prompt in prompts:
+            tokens = self._count_tokens(prompt)
+            if group and group_tokens + tokens > self.max_tokens:
+                results.extend(self._answer_group(group))
+                group, group_tokens = [], 0
+            group.append(prompt)
+            group_tokens += tokens
+
+        if group:
+            results.extend(self._answer_group(group))
+        return results
+
+    def _answer_group(self, prompts: List[str]) -> List[Any]:
+        """Send one multi-item request, falling back to one request per prompt"""
+        if len(prompts) == 1:
+            return run_predict_parallel(self.call_model, prompts)
+
+        from wire import dumps, loads
+
+        combined = _MULTI_ITEM_INSTRUCTIONS.format(count=len(prompts)) + dumps({'requests': prompts})
+        try:
+            reply = self.call_model(combined) or ''
+            # Tolerate replies wrapped in prose or code fences
+            answers = loads(reply[reply.index('{'):reply.rindex('}') + 1])['answers']
+            if isinstance(answers, list) and len(answers) == len(prompts):
+                return [answer if isinstance(answer, str) else dumps(answer) for answer in answers]
+        except Exception:
+            pass
+
+        return run_predict_parallel(self.call_model, prompts)
+
+
+def create_prompt_predictor(
+    config: Dict[str, Any],
+    model_config: Dict[str, Any],
+    client_info: Optional[Dict[str, Any]] = None,
+    static_prefix: StaticPrefix = '',
+    temperature: float = 0.0
+) -> Optional[Callable[[str], str]]:
+    """
+    Choose the prompt -> response path requested by the job config
+
+    Args:
+        config: Job configuration ('use_batch_api': bool,
+                'async_concurrency': requests in flight, 0 to disable,
+                'multi_item_batch_size': rows per prompt, 0 to disable,
+                'multi_item_max_tokens': token budget per combined prompt)
+        model_config: Model configuration dict
+        client_info: Result of get_model_client, if already created
+        static_prefix: Cacheable prompt prefix for single-row async calls
+        temperature: Sampling temperature
+
+    Returns:
+        Batching predictor (create_batched_predictor), MultiItemPredictor or
+        AsyncPredictor, or None for synchronous calls
+    """
+    if config.get('use_batch_api'):
+        predictor = create_batched_predictor(model_config, client_info, temperature)
+        if predictor is not None:
+            return predictor
+
+    concurrency = int(config.get('async_concurrency') or 0)
+
+    items_per_prompt = int(config.get('multi_item_batch_size') or 0)
+    if items_per_prompt > 1:
+        # Combined prompts go out through the async client when enabled
+        if concurrency > 0:
+            call_model = AsyncPredictor(model_config, concurrency=concurrency, temperature=temperature)
+        else:
+            if client_info is None:
+                client_info = get_model_client(model_config)
+            call_model = _make_model_caller(client_info, model_config.get('model'), temperature)
+        return MultiItemPredictor(
+            call_model,
+            model_config.get('model'),
+            max_items=items_per_prompt,
+            max_tokens=int(config.get('multi_item_max_tokens', 8000))
+        )
+
+    if concurrency > 0:
+        return AsyncPredictor(
+            model_config,
+            concurrency=concurrency,
+            temperature=temperature,
+            static_prefix=static_prefix
+        )
+
+    return None
 
 
 # ============================================================================
 # DATASET PREPARATION
 # ============================================================================
 
-def prepare_dataset(dataset_raw: List[Dict[str, Any]], dataset_name: str = "dataset") -> List[Dict[str, Any]]:
+_REQUIRED_ITEM_FIELDS = frozenset(('inputs', 'expectations'))
+
+
+def _make_row_validator(
+    required_fields: frozenset,
+    nested_field: str,
+    nested_key: str
+) -> Callable[[List[Any]], bool]:
+    """
+    Build a happy-path check for one dataset schema
+
+    The schema is fixed when the validator is built, so the loop only uses
+    local names: one set-view superset test plus one nested membership test
+    per row, with no error-message work unless a row fails.
+
+    Args:
+        required_fields: Keys every row must have
+        nested_field: Row field holding a dict that must contain nested_key
+        nested_key: Key required inside nested_field
+
+    Returns:
+        Function (rows) -> True if every row matches the schema
+    """
+    def rows_valid(rows: List[Any]) -> bool:
+        try:
+            for item in rows:
+                if not (item.keys() >= required_fields and nested_key in item[nested_field]):
+                    return False
+        except (AttributeError, TypeError):
+            return False
+        return True
+
+    return rows_valid
+
+
+_rows_valid = _make_row_validator(_REQUIRED_ITEM_FIELDS, 'expectations', 'expected_response')
+
+
+def prepare_dataset(
+    dataset_raw: List[Dict[str, Any]],
+    dataset_name: str = "dataset"
+) -> Tuple[List[Dict[str, Any]], str]:
     """
     Validate and prepare dataset for MLflow GEPA
 
@@ -193,30 +1541,44 @@ def prepare_dataset(dataset_raw: List[Dict[str, Any]], dataset_name: str = "data
         dataset_name: Name for logging
 
     Returns:
-        Validated dataset list
+        (validated dataset list, input key: the first key of the first row's
+        inputs, 'question' if it has none)
     """
     if not dataset_raw or len(dataset_raw) == 0:
         raise ValueError(f"{dataset_name} is empty")
 
-    validated_dataset = []
+    # Rows are passed through uncopied when they all match the schema
+    if _rows_valid(dataset_raw):
+        return dataset_raw, _first_input_key(dataset_raw[0]['inputs'])
 
+    # Only walk the rows again to locate the bad one for the error message
     for i, item in enumerate(dataset_raw):
+        if not isinstance(item, dict):
+            raise ValueError(f"{dataset_name}[{i}] must be an object")
         if 'inputs' not in item:
             raise ValueError(f"{dataset_name}[{i}] missing 'inputs' field")
         if 'expectations' not in item:
             raise ValueError(f"{dataset_name}[{i}] missing 'expectations' field")
-        if 'expected_response' not in item['expectations']:
+        if not isinstance(item['expectations'], dict) or 'expected_response' not in item['expectations']:
             raise ValueError(f"{dataset_name}[{i}].expectations missing 'expected_response' field")
+    return dataset_raw, _first_input_key(dataset_raw[0]['inputs'])
 
-        validated_dataset.append(item)
 
-    return validated_dataset
+def _first_input_key(inputs: Any) -> str:
+    """First key of a row's inputs, defaulting to 'question'"""
+    if isinstance(inputs, dict):
+        return next(iter(inputs), 'question')
+    return 'question'
 
 
 # ============================================================================
 # SCORER CREATION
 # ============================================================================
 
+# Scorer type -> MLflow scorer class (add entries to support more types)
+_SCORER_FACTORIES = {'correctness': Correctness, 'safety': Safety} if mlflow is not None else {}
+
+
 def create_scorers(scorer_config: Dict[str, Any]) -> List:
     """
     Create MLflow scorers based on configuration
@@ -232,8 +1594,6 @@ def create_scorers(scorer_config: Dict[str, Any]) -> List:
     Returns:
         List of MLflow scorer instances
     """
-    from mlflow.genai.scorers import Correctness, Safety
-
     scorers = []
     scorer_list = scorer_config.get('scorers', [])
 
@@ -245,16 +1605,98 @@ def create_scorers(scorer_config: Dict[str, Any]) -> List:
         scorer_type = scorer_def.get('type', 'correctness')
         scorer_model = scorer_def.get('model', 'openai/gpt-4-mini')
 
-        if scorer_type == 'correctness':
-            scorers.append(Correctness(model=scorer_model))
-        elif scorer_type == 'safety':
-            scorers.append(Safety(model=scorer_model))
+        factory = _SCORER_FACTORIES.get(scorer_type)
+        if factory is not None:
+            scorers.append(factory(model=scorer_model))
         else:
             log_progress(f"Unknown scorer type '{scorer_type}', skipping")
 
+    # Judge calls for the same row are independent; run them side by side
+    if len(scorers) > 1:
+        scorers = ParallelScorerGroup(scorers).scorers()
+
     return scorers
 
 
+class ParallelScorerGroup:
+    """
+    Run a row's scorers concurrently
+
+    Each scorer is an independent LLM judge call, but MLflow may run them one
+    after another. The wrapped scorers returned by scorers() share state per
+    row: the first wrapper called for a row starts the other scorers in a
+    thread pool and runs its own scorer in the calling (MLflow evaluation)
+    thread, and each wrapper then waits only for its own result, so a row
+    costs the slowest judge call instead of the sum.
+
+    MLflow evaluates several rows at once, so the pool is sized for that many
+    rows times the scorers started per row; a smaller pool would make rows
+    queue behind each other's judge calls.
+    """
+
+    # Rows whose results were never collected by every wrapper are dropped
+    # after this many newer rows
+    MAX_PENDING_ROWS = 1024
+
+    def __init__(self, scorer_list: List[Any]):
+        self._scorers = list(scorer_list)
+        eval_workers = int(os.environ.get('MLFLOW_GENAI_EVAL_MAX_WORKERS', '10'))
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, eval_workers * (len(self._scorers) - 1)),
+            thread_name_prefix='scorer'
+        )
+        self._lock = threading.Lock()
+        self._pending: 'OrderedDict[tuple, list]' = OrderedDict()
+
+    def _result(self, index: int, inputs: Any, outputs: Any, expectations: Any, trace: Any) -> Any:
+        """Result of scorer index for this row, starting all scorers on first use"""
+        # MLflow hands the same row objects to every scorer of a row. The
+        # entry keeps them alive, so their ids can't be reused while it exists.
+        key = (id(inputs), id(outputs), id(expectations))
+        kwargs = {'inputs': inputs, 'outputs': outputs, 'expectations': expectations, 'trace': trace}
+
+        with self._lock:
+            entry = self._pending.get(key)
+            started = entry is None
+            if started:
+                futures = [
+                    Future() if i == index else self._executor.submit(s.run, **kwargs)
+                    for i, s in enumerate(self._scorers)
+                ]
+                entry = [futures, len(self._scorers), (inputs, outputs, expectations)]
+                self._pending[key] = entry
+                while len(self._pending) > self.MAX_PENDING_ROWS:
+                    self._pending.popitem(last=False)
+
+        try:
+            future = entry[0][index]
+            if started:
+                # Run this wrapper's own scorer here instead of in the pool
+                try:
+                    future.set_result(self._scorers[index].run(**kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+            return future.result()
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0 and self._pending.get(key) is entry:
+                    del self._pending[key]
+
+    def _runner(self, index: int) -> Callable:
+        """Scorer function for index with the parameters MLflow passes by name"""
+        def run_scorer(inputs=None, outputs=None, expectations=None, trace=None):
+            return self._result(index, inputs, outputs, expectations, trace)
+        return run_scorer
+
+    def scorers(self) -> List[Any]:
+        """MLflow scorers (same names as the originals) backed by this group"""
+        return [
+            scorer(name=original.name)(self._runner(index))
+            for index, original in enumerate(self._scorers)
+        ]
+
+
 def create_aggregation_fn(scorer_config: Dict[str, Any]) -> Optional[Callable]:
     """
     Create aggregation function for multi-objective optimization
@@ -272,19 +1714,31 @@ def create_aggregation_fn(scorer_config: Dict[str, Any]) -> Optional[Callable]:
     weights = scorer_config.get('weights', {})
 
     if aggregation == 'weighted' and weights:
+        # Scorer name normalization and the weight total only depend on which
+        # scorers reported, so they are worked out once per set of names
+        weight_by_name: Dict[str, float] = {}
+        inverse_total_by_names: Dict[tuple, float] = {}
+
+        def scorer_weight(scorer_name: str) -> float:
+            weight = weight_by_name.get(scorer_name)
+            if weight is None:
+                # Extract base scorer name (e.g., 'Correctness' from full name)
+                base_name = scorer_name.lower().split('(')[0].strip()
+                weight = weight_by_name[scorer_name] = weights.get(base_name, 1.0)
+            return weight
+
         def weighted_aggregation(scores: Dict[str, float]) -> float:
             """Weighted sum of scorer results"""
-            total = 0.0
-            total_weight = 0.0
+            names = tuple(scores)
+            inverse_total = inverse_total_by_names.get(names)
+            if inverse_total is None:
+                total_weight = sum(scorer_weight(name) for name in names)
+                inverse_total = inverse_total_by_names[names] = 1.0 / total_weight if total_weight > 0 else 0.0
 
+            total = 0.0
             for scorer_name, score in scores.items():
-                # Extract base scorer name (e.g., 'Correctness' from full name)
-                base_name = scorer_name.lower().split('(')[0].strip()
-                weight = weights.get(base_name, 1.0)
-                total += score * weight
-                total_weight += weight
-
-            return total / total_weight if total_weight > 0 else 0.0
+                total += score * weight_by_name[scorer_name]
+            return total * inverse_total
 
         return weighted_aggregation
 
@@ -296,10 +1750,47 @@ def create_aggregation_fn(scorer_config: Dict[str, Any]) -> Optional[Callable]:
 # MLFLOW PROMPT REGISTRY
 # ============================================================================
 
+_active_experiment = None
+
+
+def _init_mlflow(experiment_name: str):
+    """
+    Point MLflow at the local tracking store and select the experiment
+
+    Args:
+        experiment_name: Experiment to create (if missing) and activate
+    """
+    # Use a local directory for tracking (required for the prompt registry)
+    mlruns_dir = os.path.join(tempfile.gettempdir(), 'mlflow_gepa_tracking')
+    os.makedirs(mlruns_dir, exist_ok=True)
+
+    # as_uri gives a well-formed file URI on every platform
+    # (file:///tmp/... on POSIX, file:///C:/... on Windows)
+    mlflow.set_tracking_uri(pathlib.Path(mlruns_dir).absolute().as_uri())
+
+    # Create or set experiment (required for optimization tracking)
+    # set_experiment creates a missing experiment itself; skip it entirely
+    # when the experiment is already the active one in this process
+    global _active_experiment
+    if _active_experiment == experiment_name:
+        return
+    try:
+        mlflow.set_experiment(experiment_name)
+    except Exception as e:
+        # Continue on the default experiment, but don't hide why
+        log_progress(f"Warning: Could not set experiment '{experiment_name}': {str(e)}")
+        return
+    _active_experiment = experiment_name
+
+
 def register_prompt_with_mlflow(prompt_name: str, prompt_template: str) -> Any:
     """
     Register prompt with MLflow prompt registry
 
+    Re-runs of the same prompt are the common case, so the latest registered
+    version is loaded first and only registered again when it is missing or
+    its template differs.
+
     Args:
         prompt_name: Unique name for the prompt
         prompt_template: Prompt template text with {{placeholders}}
@@ -307,10 +1798,17 @@ def register_prompt_with_mlflow(prompt_name: str, prompt_template: str) -> Any:
     Returns:
         Registered prompt object with .uri attribute
     """
-    import mlflow
+    try:
+        # Reuse the existing prompt if it already holds this template
+        prompt = mlflow.genai.load_prompt(f"prompts:/{prompt_name}/latest")
+        if prompt.template == prompt_template:
+            log_progress(f"Loaded existing prompt '{prompt_name}'")
+            return prompt
+    except Exception:
+        pass  # Not registered yet
 
     try:
-        # Register the prompt
+        # Register the prompt (a new version if the name exists)
         prompt = mlflow.genai.register_prompt(
             name=prompt_name,
             template=prompt_template
@@ -318,15 +1816,151 @@ def register_prompt_with_mlflow(prompt_name: str, prompt_template: str) -> Any:
         log_progress(f"Registered prompt '{prompt_name}'")
         return prompt
     except Exception as e:
-        # If registration fails (e.g., name exists), try to load it
-        log_progress(f"Prompt registration failed, attempting to load: {str(e)}")
-        try:
-            # Load existing prompt
-            prompt = mlflow.genai.load_prompt(f"prompts:/{prompt_name}/latest")
-            log_progress(f"Loaded existing prompt '{prompt_name}'")
-            return prompt
-        except:
-            raise RuntimeError(f"Failed to register or load prompt: {str(e)}")
+        raise RuntimeError(f"Failed to register or load prompt: {str(e)}")
+
+
+@functools.lru_cache(maxsize=8)
+def _load_prompt(prompt_uri: str) -> Any:
+    """
+    Load a prompt from the registry once per URI
+
+    Registered prompt URIs carry their version, so a cached entry never goes
+    stale. During optimize_prompts MLflow swaps candidate templates in through
+    the PromptVersion.template property, so reading .template or calling
+    .format() on the cached object still sees the candidate being evaluated.
+
+    Args:
+        prompt_uri: Versioned prompt URI (prompts:/name/version)
+
+    Returns:
+        MLflow PromptVersion
+    """
+    return mlflow.genai.load_prompt(prompt_uri)
+
+
+@functools.lru_cache(maxsize=64)
+def _template_segments(template: str) -> Tuple[str, ...]:
+    """
+    Split a prompt template around its {{placeholders}} once per template
+
+    GEPA evaluates each candidate template against many rows, so the regex
+    scan is paid once per candidate instead of once per row.
+
+    Args:
+        template: Prompt template with {{placeholders}}
+
+    Returns:
+        Literal segments at even indices, placeholder names at odd indices
+    """
+    return tuple(_PLACEHOLDER_RE.split(template))
+
+
+def _format_segments(segments: Tuple[str, ...], inputs: Dict[str, Any]) -> str:
+    """
+    Fill split template segments with inputs, like PromptVersion.format
+
+    Raises:
+        ValueError: If the template uses variables missing from inputs
+    """
+    if len(segments) == 1:
+        return segments[0]
+
+    parts = list(segments)
+    try:
+        for i in range(1, len(parts), 2):
+            parts[i] = str(inputs[parts[i]])
+    except KeyError:
+        missing = sorted({name for name in segments[1::2] if name not in inputs})
+        raise ValueError(f"Missing variables: {missing}. Prompt templates use {{{{variable}}}} placeholders.") from None
+    return ''.join(parts)
+
+
+def _format_lenient(template: str, inputs: Dict[str, Any]) -> str:
+    """Fill the placeholders named in inputs, leaving any other {{...}} text as-is"""
+    return _PLACEHOLDER_RE.sub(
+        lambda match: str(inputs[match.group(1)]) if match.group(1) in inputs else match.group(0),
+        template
+    )
+
+
+def _build_predict_fn(
+    config: Dict[str, Any],
+    model_config: Dict[str, Any],
+    prompt: Any,
+    client_info: Optional[Dict[str, Any]] = None,
+    strict: bool = True
+) -> Callable:
+    """
+    Build the predict_fn MLflow calls with each row's inputs
+
+    Args:
+        config: Job configuration (selects Batch API / async predictions)
+        model_config: Model configuration dict
+        prompt: Registered prompt (or any object with .template and .uri)
+        client_info: Result of get_model_client, if already created
+        strict: Raise on placeholders missing from the inputs, like
+                PromptVersion.format. Unregistered fallback prompts pass
+                False, which fills only the given inputs and leaves other
+                {{...}} text in the prompt.
+
+    Returns:
+        Prediction function: (**inputs) -> str
+    """
+    if client_info is None:
+        client_info = get_model_client(model_config)
+
+    model_id = model_config.get('model')
+    temperature = 0.0
+    cache = load_cache()
+    semantic_cache = load_semantic_cache()
+
+    # Bind the registered prompt once; a prompt that never made it into the
+    # registry is used as-is. MLflow swaps each candidate in through the
+    # PromptVersion.template property, so reading .template per call sees
+    # the candidate without another registry lookup. (A ContextVar set per
+    # iteration would not reach MLflow's evaluation worker threads.)
+    try:
+        current_prompt = _load_prompt(prompt.uri)
+    except Exception:
+        current_prompt = prompt
+
+    def static_prefix() -> str:
+        """Text before the first placeholder of the candidate being evaluated"""
+        return _template_segments(current_prompt.template)[0]
+
+    # Batch API / async predictors, else a direct synchronous call
+    call_model = create_prompt_predictor(config, model_config, client_info, static_prefix, temperature)
+    if call_model is None:
+        call_model = _make_model_caller(client_info, model_id, temperature, static_prefix)
+
+    # Warm up only the client that will send the requests. Batch jobs are
+    # slow anyway, so a handshake saved there is not worth a request.
+    sender = call_model.call_model if isinstance(call_model, MultiItemPredictor) else call_model
+    if isinstance(sender, AsyncPredictor):
+        sender.warm_up()
+    elif not isinstance(sender, BatchedPredictor):
+        _warm_up_client(client_info)
+
+    # GEPA re-evaluates the same (candidate, row) pairs across iterations;
+    # the formatted prompt covers both, so it is the cache key. Answers split
+    # out of combined multi-item prompts are kept apart from single-prompt
+    # answers so later normal runs never receive them.
+    mode = 'multi_item' if isinstance(call_model, MultiItemPredictor) else ''
+    cached_call = _with_response_cache(call_model, model_config, temperature, cache, semantic_cache, mode)
+
+    if strict:
+        def format_prompt(inputs: Dict[str, Any]) -> str:
+            return _format_segments(_template_segments(current_prompt.template), inputs)
+    else:
+        def format_prompt(inputs: Dict[str, Any]) -> str:
+            return _format_lenient(current_prompt.template, inputs)
+
+    def predict_fn(**kwargs) -> str:
+        """Prediction function for MLflow"""
+        # Format the current candidate prompt (MLflow swaps it in during optimization)
+        return cached_call(format_prompt(kwargs))
+
+    return predict_fn
 
 
 # ============================================================================
@@ -357,9 +1991,6 @@ def run_gepa_optimization(
     Returns:
         PromptOptimizationResult object
     """
-    import mlflow
-    from mlflow.genai.optimize import GepaPromptOptimizer
-
     log_progress(f"Starting optimization ({len(train_data)} examples, {max_metric_calls} max calls)")
 
     # Create GEPA optimizer
@@ -396,6 +2027,24 @@ def run_gepa_optimization(
 # RESULT EXTRACTION
 # ============================================================================
 
+_RESULT_DEFAULTS = {
+    'initial_score': 0.0,
+    'final_score': 0.0,
+    'optimized_prompt_text': '',
+    'optimizer_name': '',
+    'iterations': 0
+}
+
+# (result attribute, cast, output key); earlier attributes win for the same key
+_RESULT_FIELDS = (
+    ('initial_eval_score', float, 'initial_score'),
+    ('final_eval_score', float, 'final_score'),
+    ('optimizer_name', str, 'optimizer_name'),
+    ('iterations', int, 'iterations'),
+    ('num_iterations', int, 'iterations'),
+)
+
+
 def extract_optimization_results(result: Any) -> Dict[str, Any]:
     """
     Extract results from MLflow PromptOptimizationResult
@@ -406,44 +2055,29 @@ def extract_optimization_results(result: Any) -> Dict[str, Any]:
     Returns:
         Dictionary with extracted results
     """
-    extracted = {
-        'initial_score': 0.0,
-        'final_score': 0.0,
-        'optimized_prompt_text': '',
-        'optimizer_name': '',
-        'iterations': 0
-    }
+    extracted = dict(_RESULT_DEFAULTS)
 
     try:
-        # Extract scores
-        if hasattr(result, 'initial_eval_score'):
-            extracted['initial_score'] = float(result.initial_eval_score)
-
-        if hasattr(result, 'final_eval_score'):
-            extracted['final_score'] = float(result.final_eval_score)
-
-        # Extract optimizer name
-        if hasattr(result, 'optimizer_name'):
-            extracted['optimizer_name'] = str(result.optimizer_name)
+        # One getattr per attribute; fields the result doesn't carry keep their defaults
+        filled = set()
+        for attr, cast, out_key in _RESULT_FIELDS:
+            if out_key in filled:
+                continue  # Already set from a preferred attribute
+            value = getattr(result, attr, None)
+            if value is not None:
+                extracted[out_key] = cast(value)
+                filled.add(out_key)
 
         # Extract optimized prompts
-        if hasattr(result, 'optimized_prompts') and result.optimized_prompts:
-            optimized_prompt = result.optimized_prompts[0]
+        optimized_prompts = getattr(result, 'optimized_prompts', None)
+        if optimized_prompts:
+            optimized_prompt = optimized_prompts[0]
 
-            # Get the template text
-            if hasattr(optimized_prompt, 'template'):
-                extracted['optimized_prompt_text'] = str(optimized_prompt.template)
-            elif hasattr(optimized_prompt, 'text'):
-                extracted['optimized_prompt_text'] = str(optimized_prompt.text)
-            else:
-                # Try to convert to string
-                extracted['optimized_prompt_text'] = str(optimized_prompt)
-
-        # Try to estimate iterations from result (if available)
-        if hasattr(result, 'iterations'):
-            extracted['iterations'] = int(result.iterations)
-        elif hasattr(result, 'num_iterations'):
-            extracted['iterations'] = int(result.num_iterations)
+            # Get the template text, else fall back to converting the prompt to a string
+            text = getattr(optimized_prompt, 'template', None)
+            if text is None:
+                text = getattr(optimized_prompt, 'text', None)
+            extracted['optimized_prompt_text'] = str(optimized_prompt if text is None else text)
 
     except Exception as e:
         log_progress(f"Warning: Could not fully extract results: {str(e)}")
@@ -455,152 +2089,110 @@ def extract_optimization_results(result: Any) -> Dict[str, Any]:
 # MAIN OPTIMIZATION WORKFLOW
 # ============================================================================
 
-def main():
-    """Main optimization workflow"""
+def run_job(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run one optimization job received on stdin
 
-    try:
-        # Step 1: Read configuration from stdin
-        config_json = sys.stdin.read()
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        Success result message
+    """
+    # Step 2: Check MLflow is installed (imported at module load)
+    if mlflow is None:
+        raise ImportError(
+            "MLflow library not found. Please install it with: pip install mlflow>=3.5.0"
+        )
 
-        if not config_json or not config_json.strip():
-            raise ValueError("No configuration received on stdin")
+    # Step 3: Initialize MLflow tracking (required for prompt registry)
+    _init_mlflow("gepa_optimization")
 
-        config = json.loads(config_json)
+    # Step 4: Prepare dataset and determine the input key from its first row
+    train_data, input_key = prepare_dataset(config['train_dataset'], 'train_dataset')
 
-        # Step 2: Import MLflow (check if installed)
-        try:
-            import mlflow
-            from mlflow.genai.optimize import GepaPromptOptimizer
-            from mlflow.genai.scorers import Correctness, Safety
-        except ImportError as e:
-            raise ImportError(
-                "MLflow library not found. Please install it with: pip install mlflow>=3.5.0"
-            )
+    # Step 5: Extract initial prompt template
+    initial_prompt = config.get('initial_prompt', 'Answer the following question: {{question}}')
 
-        # Step 3: Initialize MLflow tracking (required for prompt registry)
-        # Use a local directory for tracking
-        mlruns_dir = os.path.join(tempfile.gettempdir(), 'mlflow_gepa_tracking')
-        os.makedirs(mlruns_dir, exist_ok=True)
+    # Step 6: Register prompt with MLflow
+    prompt_name = config.get('prompt_name', f'gepa_prompt_{os.getpid()}')
+    prompt = register_prompt_with_mlflow(prompt_name, initial_prompt)
 
-        # Format tracking URI for cross-platform compatibility
-        # Convert Windows path separators to forward slashes for file URI
-        tracking_path = mlruns_dir.replace('\\', '/')
-        # Use file:/// (three slashes) for local file URIs
-        mlflow.set_tracking_uri(f"file:///{tracking_path}")
+    # Step 7: Create prediction function
+    # The predict_fn will be called with kwargs matching the 'inputs' in train_data
+    predict_fn = _build_predict_fn(config, config['model_config'], prompt)
 
-        # Create or set experiment (required for optimization tracking)
-        experiment_name = "gepa_optimization"
-        try:
-            experiment = mlflow.get_experiment_by_name(experiment_name)
-            if experiment is None:
-                mlflow.create_experiment(experiment_name)
-            mlflow.set_experiment(experiment_name)
-        except Exception:
-            pass  # Continue anyway - MLflow will use default experiment
-        train_data = prepare_dataset(config['train_dataset'], 'train_dataset')
-
-        # Step 5: Extract initial prompt template
-        initial_prompt = config.get('initial_prompt', 'Answer the following question: {{question}}')
-
-        # Step 6: Determine input key from dataset
-        # Extract the first input key from the dataset
-        input_key = 'question'  # default
-        if train_data and 'inputs' in train_data[0]:
-            input_keys = list(train_data[0]['inputs'].keys())
-            if input_keys:
-                input_key = input_keys[0]
-
-        # Step 7: Register prompt with MLflow
-        prompt_name = config.get('prompt_name', f'gepa_prompt_{os.getpid()}')
-        prompt = register_prompt_with_mlflow(prompt_name, initial_prompt)
-
-        # Step 8: Create prediction function
-        model_config = config['model_config']
-
-        # We need to create a predict_fn that MLflow can call
-        # The predict_fn will be called with kwargs matching the 'inputs' in train_data
-        def predict_fn(**kwargs) -> str:
-            """Prediction function for MLflow"""
-            # Load the current prompt (MLflow will update it during optimization)
-            current_prompt = mlflow.genai.load_prompt(prompt.uri)
-            formatted = current_prompt.format(**kwargs)
-
-            # Call the model
-            provider = model_config.get('provider', 'openai')
-            model_id = model_config.get('model')
-            client = get_model_client(model_config)
-
-            if provider == 'openai' or provider == 'ollama':
-                completion = client.chat.completions.create(
-                    model=model_id,
-                    messages=[{"role": "user", "content": formatted}],
-                    temperature=0.0
-                )
-                return completion.choices[0].message.content
+    # Step 8: Create scorers
+    scorer_config = config.get('scorer_config', {'scorers': [{'type': 'correctness'}]})
+    scorers = create_scorers(scorer_config)
+    aggregation = create_aggregation_fn(scorer_config)
 
-            elif provider == 'anthropic':
-                message = client.messages.create(
-                    model=model_id,
-                    max_tokens=1024,
-                    messages=[{"role": "user", "content": formatted}],
-                    temperature=0.0
-                )
-                return message.content[0].text
+    # Step 9: Run GEPA optimization
+    reflection_model = config.get('reflection_model', 'openai/gpt-4')
+    max_metric_calls = config.get('max_metric_calls', 300)
 
-            elif provider == 'google':
-                model = client.GenerativeModel(model_id)
-                response = model.generate_content(formatted)
-                return response.text
+    result = run_gepa_optimization(
+        predict_fn=predict_fn,
+        train_data=train_data,
+        prompt_uri=prompt.uri,
+        reflection_model=reflection_model,
+        max_metric_calls=max_metric_calls,
+        scorers=scorers,
+        aggregation=aggregation
+    )
 
-            else:
-                raise ValueError(f"Unsupported provider: {provider}")
+    # Step 10: Extract results
+    extracted = extract_optimization_results(result)
+
+    # Step 11: Return success result
+
+    success_result = {
+        'type': 'success',
+        'initial_score': extracted['initial_score'],
+        'final_score': extracted['final_score'],
+        'optimized_prompt_text': extracted['optimized_prompt_text'],
+        'optimizer_name': extracted.get('optimizer_name', 'GEPA'),
+        'iterations': extracted.get('iterations', 0),
+        'dataset_size': len(train_data),
+        'reflection_model': reflection_model,
+        'max_metric_calls': max_metric_calls
+    }
 
-        # Step 9: Create scorers
-        scorer_config = config.get('scorer_config', {'scorers': [{'type': 'correctness'}]})
-        scorers = create_scorers(scorer_config)
-        aggregation = create_aggregation_fn(scorer_config)
+    return success_result
 
-        # Step 10: Run GEPA optimization
-        reflection_model = config.get('reflection_model', 'openai/gpt-4')
-        max_metric_calls = config.get('max_metric_calls', 300)
 
-        result = run_gepa_optimization(
-            predict_fn=predict_fn,
-            train_data=train_data,
-            prompt_uri=prompt.uri,
-            reflection_model=reflection_model,
-            max_metric_calls=max_metric_calls,
-            scorers=scorers,
-            aggregation=aggregation
-        )
+def main():
+    """
+    Main optimization workflow
 
-        # Step 11: Extract results
-        extracted = extract_optimization_results(result)
+    With --serve the worker stays alive and runs one job per message until
+    stdin closes, so the MLflow import cost is paid once across jobs.
+    """
+    persistent = '--serve' in sys.argv[1:]
 
-        # Step 12: Return success result
+    while True:
+        try:
+            # Step 1: Read configuration from stdin
+            config = recv(persistent=persistent)
 
-        success_result = {
-            'type': 'success',
-            'initial_score': extracted['initial_score'],
-            'final_score': extracted['final_score'],
-            'optimized_prompt_text': extracted['optimized_prompt_text'],
-            'optimizer_name': extracted.get('optimizer_name', 'GEPA'),
-            'iterations': extracted.get('iterations', 0),
-            'dataset_size': len(train_data),
-            'reflection_model': reflection_model,
-            'max_metric_calls': max_metric_calls
-        }
+            if not config:
+                if persistent:
+                    break
+                raise ValueError("No configuration received on stdin")
 
-        print(json.dumps(success_result), flush=True)
-        sys.exit(0)
+            send(run_job(config), flush_now=True)
 
-    except Exception as e:
-        # Catch all exceptions and return error
-        error_msg = str(e)
-        error_trace = traceback.format_exc()
+        except Exception as e:
+            # Catch all exceptions and return error
+            error_msg = str(e)
+            error_trace = traceback.format_exc()
 
-        log_error(error_msg, error_trace)
-        sys.exit(1)
+            log_error(error_msg, error_trace)
+            if not persistent:
+                sys.exit(1)
+
+        if not persistent:
+            sys.exit(0)
 
 
 def optimize_with_gepa(config: Dict[str, Any]) -> Dict[str, Any]:
@@ -616,6 +2208,10 @@ def optimize_with_gepa(config: Dict[str, Any]) -> Dict[str, Any]:
             - input_key: Key name for input (default: 'question')
             - gepa_config: GEPA optimizer settings
             - mlflow_config: MLflow tracking settings
+            - use_batch_api: Submit predictions as OpenAI/Anthropic batch jobs
+              (LiteLLM providers: grouped litellm.batch_completion calls)
+            - async_concurrency: Overlap up to this many predictions (0 = off)
+            - multi_item_batch_size: Answer this many rows per prompt (0 = off)
 
     Returns:
         Result dictionary with keys:
@@ -625,133 +2221,53 @@ def optimize_with_gepa(config: Dict[str, Any]) -> Dict[str, Any]:
             - mlflow_run_id: MLflow run ID
     """
     try:
-        # Import MLflow
-        try:
-            import mlflow
-            from mlflow.genai.optimize import GepaPromptOptimizer
-            from mlflow.genai.scorers import Correctness, Safety
-        except ImportError as e:
+        # Check MLflow is installed (imported at module load)
+        if mlflow is None:
             return {
                 'type': 'error',
-                'message': f"MLflow library not found. Please install it with: pip install mlflow>=3.5.0. Error: {str(e)}"
+                'message': f"MLflow library not found. Please install it with: pip install mlflow>=3.5.0. Error: {str(_MLFLOW_IMPORT_ERROR)}"
             }
 
         # Initialize MLflow tracking
-        mlruns_dir = os.path.join(tempfile.gettempdir(), 'mlflow_gepa_tracking')
-        os.makedirs(mlruns_dir, exist_ok=True)
-
-        tracking_path = mlruns_dir.replace('\\', '/')
-        mlflow.set_tracking_uri(f"file:///{tracking_path}")
-
-        # Create or set experiment
-        experiment_name = config.get('mlflow_config', {}).get('experiment_name', 'tokn-gepa')
-        try:
-            experiment = mlflow.get_experiment_by_name(experiment_name)
-            if experiment is None:
-                mlflow.create_experiment(experiment_name)
-            mlflow.set_experiment(experiment_name)
-        except Exception:
-            pass  # Use default experiment
+        _init_mlflow(config.get('mlflow_config', {}).get('experiment_name', 'tokn-gepa'))
 
         # Transform dataset format if needed
         # Input: {input: str, expected_output: str}
         # MLflow needs: {inputs: {...}, expectations: {expected_response: str}}
         input_key = config.get('input_key', 'question')
-        train_data = []
-        for ex in config['dataset']:
-            train_data.append({
+        train_data = [
+            {
                 'inputs': {input_key: ex['input']},
                 'expectations': {'expected_response': ex['expected_output']}
-            })
+            }
+            for ex in config['dataset']
+        ]
 
         # Get initial prompt
         initial_prompt = config['prompt_template']
 
         # Register prompt with MLflow
-        prompt_name = f'gepa_prompt_{hash(initial_prompt) % 1000000}'
+        # blake2b is stable across processes (hash() is salted per process),
+        # so the same prompt maps to the same registry name on every run
+        prompt_digest = hashlib.blake2b(initial_prompt.encode('utf-8'), digest_size=8).hexdigest()
+        prompt_name = f'gepa_prompt_{prompt_digest}'
+        registered = True
         try:
-            prompt = mlflow.genai.register_prompt(
-                name=prompt_name,
-                template=initial_prompt
-            )
-        except Exception:
-            # If registration fails, try to load existing
-            try:
-                prompt = mlflow.genai.load_prompt(f"prompts:/{prompt_name}/latest")
-            except Exception:
-                # Create a simple fallback
-                class SimplePrompt:
-                    def __init__(self, template):
-                        self.template = template
-                        self.uri = f"prompts:/{prompt_name}/latest"
-                prompt = SimplePrompt(initial_prompt)
+            prompt = register_prompt_with_mlflow(prompt_name, initial_prompt)
+        except RuntimeError:
+            registered = False
+            # Create a simple fallback
+            class SimplePrompt:
+                def __init__(self, template):
+                    self.template = template
+                    self.uri = f"prompts:/{prompt_name}/latest"
+            prompt = SimplePrompt(initial_prompt)
 
         # Get model config (use first model in list)
         model_config = config['model_configs'][0] if config['model_configs'] else {}
 
-        # Get client info for prediction
-        model_id = model_config.get('model')
-        client_info = get_model_client(model_config)
-
         # Create prediction function
-        def predict_fn(**kwargs) -> str:
-            """Prediction function for MLflow with LiteLLM fallback"""
-            # Format the prompt with inputs
-            formatted = initial_prompt
-            for key, value in kwargs.items():
-                formatted = formatted.replace(f'{{{{{key}}}}}', str(value))
-
-            # Call the model based on client type
-            client_type = client_info.get('type')
-
-            if client_type == 'openai':
-                client = client_info['client']
-                completion = client.chat.completions.create(
-                    model=model_id,
-                    messages=[{"role": "user", "content": formatted}],
-                    temperature=0.0
-                )
-                return completion.choices[0].message.content
-
-            elif client_type == 'anthropic':
-                client = client_info['client']
-                message = client.messages.create(
-                    model=model_id,
-                    max_tokens=1024,
-                    messages=[{"role": "user", "content": formatted}],
-                    temperature=0.0
-                )
-                return message.content[0].text
-
-            elif client_type == 'google':
-                client = client_info['client']
-                model = client.GenerativeModel(model_id)
-                response = model.generate_content(formatted)
-                return response.text
-
-            elif client_type == 'litellm':
-                # Use LiteLLM for universal provider support
-                import litellm
-
-                # Build model string (provider/model)
-                provider = client_info['provider']
-                model_string = f"{provider}/{model_id}"
-
-                # Set up API key and base if provided
-                if client_info.get('api_key'):
-                    os.environ[f"{provider.upper()}_API_KEY"] = client_info['api_key']
-                if client_info.get('api_base'):
-                    os.environ[f"{provider.upper()}_API_BASE"] = client_info['api_base']
-
-                response = litellm.completion(
-                    model=model_string,
-                    messages=[{"role": "user", "content": formatted}],
-                    temperature=0.0
-                )
-                return response.choices[0].message.content
-
-            else:
-                raise ValueError(f"Unsupported client type: {client_type}")
+        predict_fn = _build_predict_fn(config, model_config, prompt, strict=registered)
 
         # Set up API key in environment for LiteLLM (needed by scorers)
         provider = model_config.get('provider', 'openai')
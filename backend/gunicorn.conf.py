@@ -0,0 +1,10 @@
+"""
+gunicorn configuration
+Loaded automatically when gunicorn runs from the backend directory
+"""
+
+
+def post_worker_init(worker):
+    """Start this worker's warm optimizer pool (no-op unless WORKER_POOL_SIZE > 0)"""
+    import worker_pool
+    worker_pool.start()
@@ -2,10 +2,9 @@
 DSPy optimization endpoint
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 import sys
 import os
-import json
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
@@ -19,8 +18,17 @@ def optimize_dspy():
     Receives optimization configuration and returns optimized prompt
     """
     try:
-        # Parse request body
-        data = request.get_json()
+        # Parse request body with the app's (orjson) JSON provider directly,
+        # skipping get_json's content-type check and body caching
+        body = request.get_data(cache=False)
+        try:
+            data = current_app.json.loads(body) if body else None
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'Request body must be valid JSON',
+                'code': 'INVALID_REQUEST'
+            }), 400
 
         if not data:
             return jsonify({
@@ -39,8 +47,8 @@ def optimize_dspy():
                     'code': 'INVALID_REQUEST'
                 }), 400
 
-        # Import DSPy optimizer
-        from dspy_custom.dspy_optimizer import optimize_prompt
+        # Import worker pool (runs in a warm worker when WORKER_POOL_SIZE > 0)
+        from worker_pool import run_dspy_job
 
         # Transform API request to dspy_optimizer format
         config = {
@@ -67,13 +75,7 @@ def optimize_dspy():
         }
 
         # Run optimization
-        logs = []
-
-        def progress_callback(message):
-            logs.append(message)
-            print(message)  # Frontend adds [DSPy] prefix
-
-        result = optimize_prompt(config, progress_callback)
+        result, logs = run_dspy_job(config)
 
         if result['type'] == 'success':
             return jsonify({
@@ -2,7 +2,7 @@
 GEPA optimization endpoint
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 import sys
 import os
 
@@ -18,8 +18,17 @@ def optimize_gepa():
     Receives optimization configuration and returns optimized prompt
     """
     try:
-        # Parse request body
-        data = request.get_json()
+        # Parse request body with the app's (orjson) JSON provider directly,
+        # skipping get_json's content-type check and body caching
+        body = request.get_data(cache=False)
+        try:
+            data = current_app.json.loads(body) if body else None
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'Request body must be valid JSON',
+                'code': 'INVALID_REQUEST'
+            }), 400
 
         if not data:
             return jsonify({
@@ -38,8 +47,8 @@ def optimize_gepa():
                     'code': 'INVALID_REQUEST'
                 }), 400
 
-        # Import GEPA optimizer
-        from gepa_custom.gepa_optimizer import optimize_with_gepa
+        # Import worker pool (runs in a warm worker when WORKER_POOL_SIZE > 0)
+        from worker_pool import run_gepa_job
 
         # Transform API request to gepa_optimizer format
         config = {
@@ -74,7 +83,7 @@ def optimize_gepa():
         }
 
         # Run optimization
-        result = optimize_with_gepa(config)
+        result = run_gepa_job(config)
 
         if result['type'] == 'success':
             tracking_url = None
@@ -0,0 +1,242 @@
+"""
+Worker wire protocol
+Message framing between the optimizer workers and the process that spawns them
+
+Output is buffered and flushed by a background timer every 50ms, after every
+8 buffered messages, and immediately for messages sent with flush_now=True,
+so a burst of progress messages costs one write syscall per 8 lines instead
+of one per line.
+
+Formats (selected with the WORKER_WIRE_FORMAT environment variable):
+- 'json' (default): configuration is read as one JSON document from stdin
+  (one JSON document per line for persistent workers), messages are written
+  as line-delimited JSON
+- 'msgpack': every message in both directions is a 4-byte big-endian length
+  prefix followed by a msgpack payload
+"""
+
+import sys
+import os
+import io
+import json
+import threading
+import time
+from typing import Any, Optional
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+WIRE_FORMAT = os.environ.get('WORKER_WIRE_FORMAT', 'json').lower()
+
+if WIRE_FORMAT not in ('json', 'msgpack'):
+    raise ValueError(f"Unsupported WORKER_WIRE_FORMAT: {WIRE_FORMAT}. Use 'json' or 'msgpack'.")
+
+if WIRE_FORMAT == 'msgpack' and msgpack is None:
+    raise ImportError("WORKER_WIRE_FORMAT=msgpack requires msgpack. Install it with: pip install msgpack")
+
+_HEADER_SIZE = 4
+_FLUSH_INTERVAL = 0.05
+_FLUSH_EVERY = 8
+_STDIN_BUFFER_SIZE = 128 * 1024
+
+_stdin = None
+
+_flusher = None
+_flusher_lock = threading.Lock()
+_unflushed = 0
+_binary_out = False
+
+
+if orjson is not None:
+    def dumps(obj: Any) -> str:
+        """Serialize obj to JSON (orjson, falling back to json for unsupported types)"""
+        try:
+            return orjson.dumps(obj).decode('utf-8')
+        except TypeError:
+            return json.dumps(obj)
+
+    loads = orjson.loads
+else:
+    dumps = json.dumps
+    loads = json.loads
+
+
+def _read_exact(stream, size: int) -> bytes:
+    """Read exactly size bytes, or fewer only at end of stream"""
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = stream.read(remaining)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+def _stdin_reader():
+    """
+    Binary stdin with a 128 KiB buffer
+
+    Configs with large datasets arrive through a pipe; a bigger buffer means
+    far fewer read() syscalls than the default 8 KiB.
+    """
+    global _stdin
+
+    if _stdin is None:
+        raw = getattr(sys.stdin.buffer, 'raw', None)
+        if raw is None:
+            _stdin = sys.stdin.buffer  # stdin replaced by a non-file stream
+        else:
+            _stdin = io.BufferedReader(raw, buffer_size=_STDIN_BUFFER_SIZE)
+    return _stdin
+
+
+def flush():
+    """Flush any buffered output"""
+    global _unflushed
+
+    _unflushed = 0
+    try:
+        sys.stdout.flush()
+    except (OSError, ValueError):
+        pass  # stdout closed by the parent
+
+
+def _start_flusher():
+    """Start the periodic flush thread on first use"""
+    global _flusher, _binary_out
+
+    with _flusher_lock:
+        if _flusher is not None:
+            return
+
+        # Let buffered messages accumulate between timer flushes. Text writes
+        # (including stray prints from libraries) pass straight through to the
+        # binary buffer, so messages written there as bytes stay in order.
+        try:
+            sys.stdout.reconfigure(encoding='utf-8', line_buffering=False, write_through=True)
+            _binary_out = orjson is not None
+        except AttributeError:
+            pass  # stdout replaced by something that isn't a TextIOWrapper
+
+        def flush_loop():
+            while True:
+                time.sleep(_FLUSH_INTERVAL)
+                flush()
+
+        _flusher = threading.Thread(target=flush_loop, name='wire-flush', daemon=True)
+        _flusher.start()
+
+
+def send(obj: Any, flush_now: bool = False):
+    """
+    Write one message to stdout
+
+    Args:
+        obj: Message to send
+        flush_now: Flush immediately (final success/error messages)
+    """
+    if _flusher is None:
+        _start_flusher()
+
+    if WIRE_FORMAT == 'msgpack':
+        payload = msgpack.packb(obj, use_bin_type=True)
+        sys.stdout.buffer.write(len(payload).to_bytes(_HEADER_SIZE, 'big') + payload)
+    elif _binary_out:
+        # Write orjson's bytes straight to the binary buffer instead of
+        # decoding to str and having stdout re-encode it
+        try:
+            payload = orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            payload = (json.dumps(obj) + '\n').encode('utf-8')
+        sys.stdout.buffer.write(payload)
+    else:
+        sys.stdout.write(dumps(obj) + '\n')
+
+    _count_and_flush(flush_now)
+
+
+def _count_and_flush(flush_now: bool = False):
+    """Flush now if requested or once _FLUSH_EVERY messages are buffered"""
+    global _unflushed
+
+    _unflushed += 1
+    if flush_now or _unflushed >= _FLUSH_EVERY:
+        flush()
+
+
+# Literal text around the message slot of a plain progress line
+_PROGRESS_PREFIX = '{"type":"progress","message":'
+_PROGRESS_SUFFIX = '}\n'
+_PROGRESS_PREFIX_BYTES = _PROGRESS_PREFIX.encode('utf-8')
+_PROGRESS_SUFFIX_BYTES = _PROGRESS_SUFFIX.encode('utf-8')
+
+
+def send_progress(message: str, data: Optional[Any] = None):
+    """
+    Write one {'type': 'progress'} message to stdout
+
+    Plain progress lines (no data) are the bulk of worker output, so in JSON
+    mode only the message string is serialized and spliced between prebuilt
+    literals.
+
+    Args:
+        message: Progress message
+        data: Optional structured payload
+    """
+    if data or WIRE_FORMAT != 'json' or not isinstance(message, str):
+        progress = {'type': 'progress', 'message': message}
+        if data:
+            progress['data'] = data
+        send(progress)
+        return
+
+    if _flusher is None:
+        _start_flusher()
+    if _binary_out:
+        sys.stdout.buffer.write(_PROGRESS_PREFIX_BYTES + orjson.dumps(message) + _PROGRESS_SUFFIX_BYTES)
+    else:
+        sys.stdout.write(_PROGRESS_PREFIX + dumps(message) + _PROGRESS_SUFFIX)
+    _count_and_flush()
+
+
+def recv(persistent: bool = False) -> Optional[Any]:
+    """
+    Read one message from stdin
+
+    Args:
+        persistent: Read one job of several (a line in JSON mode) instead of
+                    the whole of stdin
+
+    Returns:
+        Decoded message, or None if stdin is exhausted or empty
+    """
+    stream = _stdin_reader()
+
+    if WIRE_FORMAT == 'msgpack':
+        header = _read_exact(stream, _HEADER_SIZE)
+        if len(header) < _HEADER_SIZE:
+            return None
+        payload = _read_exact(stream, int.from_bytes(header, 'big'))
+        return msgpack.unpackb(payload, raw=False)
+
+    # Both decoders accept UTF-8 bytes, so stdin is never decoded to str.
+    # isspace() checks for blank input without making a stripped copy.
+    if persistent:
+        for line in stream:
+            if not line.isspace():
+                return loads(line)
+        return None
+
+    config_json = stream.read()
+    if not config_json or config_json.isspace():
+        return None
+    return loads(config_json)
@@ -0,0 +1,165 @@
+"""
+Warm optimizer worker pool
+Runs DSPy/GEPA jobs in long-lived subprocesses that import the heavy
+libraries once at startup, instead of paying that cost on the first request
+
+The pool is per server process: under gunicorn every worker process gets its
+own pool (started by the post_worker_init hook in gunicorn.conf.py), so the
+total is WORKER_POOL_SIZE x GUNICORN_WORKERS optimizer processes. If a worker
+process dies (e.g. killed for running out of memory) the pool is rebuilt
+instead of failing every later job.
+
+Configured via environment variables:
+- WORKER_POOL_SIZE: Number of warm worker processes per server process
+  (default: 0, run jobs in the request process)
+"""
+
+import os
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+POOL_SIZE = int(os.environ.get('WORKER_POOL_SIZE', '0'))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _warm_up():
+    """Import the optimizer modules (and their DSPy/MLflow dependencies) once per worker"""
+    try:
+        import dspy_custom.dspy_optimizer
+    except Exception:
+        pass  # Reported when a DSPy job runs
+
+    try:
+        import gepa_custom.gepa_optimizer
+        import mlflow
+        from mlflow.genai.optimize import GepaPromptOptimizer
+    except Exception:
+        pass  # Reported when a GEPA job runs
+
+
+def _ping() -> int:
+    """No-op task used to force worker processes to start"""
+    return os.getpid()
+
+
+def _run_dspy(config: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """Run a DSPy job, collecting progress messages"""
+    from dspy_custom.dspy_optimizer import optimize_prompt
+
+    logs = []
+
+    def progress_callback(message):
+        logs.append(message)
+        print(message)  # Frontend adds [DSPy] prefix
+
+    result = optimize_prompt(config, progress_callback)
+    return result, logs
+
+
+def _run_gepa(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a GEPA job"""
+    from gepa_custom.gepa_optimizer import optimize_with_gepa
+
+    return optimize_with_gepa(config)
+
+
+def _enabled() -> bool:
+    """Whether jobs run in the pool (never from inside a pool worker itself)"""
+    return POOL_SIZE > 0 and multiprocessing.parent_process() is None
+
+
+def start() -> Optional[ProcessPoolExecutor]:
+    """
+    Spawn POOL_SIZE warm workers
+
+    Called by the serving process once it is ready to take requests, and
+    lazily by the first job otherwise. No-op when the pool is disabled or
+    already running, or when called from inside a worker (spawned children
+    re-import the main module).
+
+    Returns:
+        The running pool, or None when the pool is disabled
+    """
+    global _pool
+
+    if not _enabled():
+        return None
+
+    with _pool_lock:
+        if _pool is not None:
+            return _pool
+
+        _pool = ProcessPoolExecutor(
+            max_workers=POOL_SIZE,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_warm_up
+        )
+        # Workers start lazily; submit one task each so they warm up now
+        for _ in range(POOL_SIZE):
+            _pool.submit(_ping)
+        return _pool
+
+
+def _restart(broken: ProcessPoolExecutor) -> ProcessPoolExecutor:
+    """Replace a broken pool (once, however many jobs noticed it)"""
+    global _pool
+
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+            broken.shutdown(wait=False, cancel_futures=True)
+    return start()
+
+
+def _run(fn: Callable, config: Dict[str, Any]) -> Any:
+    """
+    Run fn(config) in the pool, or in this process when the pool is disabled
+
+    Raises:
+        RuntimeError: If the worker running the job died; the pool is rebuilt
+                      so later jobs run normally
+    """
+    pool = start()
+    if pool is None:
+        return fn(config)
+
+    try:
+        future = pool.submit(fn, config)
+    except BrokenProcessPool:
+        # Broken by an earlier job; this one never started, so just resubmit
+        pool = _restart(pool)
+        future = pool.submit(fn, config)
+
+    try:
+        return future.result()
+    except BrokenProcessPool:
+        _restart(pool)
+        raise RuntimeError(
+            "Optimizer worker process exited unexpectedly (it may have run out of memory). "
+            "The worker pool was restarted; retry the request."
+        )
+
+
+def run_dspy_job(config: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Run a DSPy optimization job
+
+    Returns:
+        (result dict, progress log lines)
+    """
+    return _run(_run_dspy, config)
+
+
+def run_gepa_job(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run a GEPA optimization job
+
+    Returns:
+        Result dict
+    """
+    return _run(_run_gepa, config)